@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for csv-cleaner.
+
+Subcommands:
+  generate  Write a deterministic synthetic CSV (rows, column mix,
+            missing-value rate and duplicate rate are configurable).
+  run       Time and memory-profile each cleaner function on a synthetic
+            file and store the results as a JSON baseline.
+  startup   Time importing cleaner and running the CLI in fresh interpreters,
+            and fail if pandas or NumPy get imported before data is read.
+  compare   Compare two result files and exit with status 1 when a function
+            got slower or allocates more than the allowed tolerance.
+
+Examples:
+  python3 benchmarks/bench_cleaner.py run --rows 1e5 --out benchmarks/results/current.json
+  python3 benchmarks/bench_cleaner.py startup --out benchmarks/results/startup.json
+  python3 benchmarks/bench_cleaner.py compare benchmarks/results/baseline.json benchmarks/results/current.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add src folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "../src")
+sys.path.insert(0, src_dir)
+
+import cleaner  # noqa: E402
+
+FUNCTIONS = ["read_csv", "auto_detect_numeric", "fill_strings", "fill_numbers",
+             "remove_duplicates", "save_csv", "save_pretty"]
+
+CITIES = ["New York", "Los Angeles", "Chicago", "Miami", "San Francisco", "Oslo", "Paris", "Rome"]
+GENERATE_BLOCK_ROWS = 100_000
+
+# Startup cases: CLI arguments, or None to only import the module
+STARTUP_CASES = {
+    "import_cleaner": None,
+    "cli_help": ["--help"],
+    "cli_missing_file": ["--in", "missing.csv"],
+}
+HEAVY_MODULES = ("pandas", "numpy")
+
+# Runs one startup case in a fresh interpreter and prints its findings as JSON
+STARTUP_CHILD = """
+import contextlib, io, json, runpy, sys, tracemalloc
+trace = {trace!r}
+if trace:
+    tracemalloc.start()
+sys.path.insert(0, {src_dir!r})
+argv = {argv!r}
+if argv is None:
+    import cleaner
+else:
+    sys.argv = ["cleaner.py"] + argv
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        try:
+            runpy.run_path({script!r}, run_name="__main__")
+        except SystemExit:
+            pass
+print(json.dumps({{
+    "peak_bytes": tracemalloc.get_traced_memory()[1] if trace else 0,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+# -----------------------
+# Synthetic data
+# -----------------------
+def generate_block(rng, start, rows, text_cols, numeric_cols, numeric_text_cols, missing_rate, duplicate_rate):
+    """One block of synthetic rows; row ids start at `start` so blocks never collide."""
+    ids = np.arange(start, start + rows)
+    data = {}
+    for i in range(text_cols):
+        if i % 2 == 0:
+            # High cardinality with stray whitespace, like names or emails
+            values = np.char.add(np.char.add(" user", ids.astype(str)), "@example.com ")
+        else:
+            # Low cardinality, like city or status
+            values = np.array(CITIES)[rng.integers(0, len(CITIES), rows)]
+        data[f" Text {i} "] = values.astype(object)
+    for i in range(numeric_cols):
+        values = rng.integers(0, 1000, rows).astype("float64")
+        if i % 2:
+            values += rng.choice([0.0, 0.25, 0.5], rows)
+        data[f"Number {i}"] = values
+    for i in range(numeric_text_cols):
+        # Numbers stored as text with a few junk values, to exercise detection
+        values = rng.integers(0, 100, rows).astype(str).astype(object)
+        values[rng.random(rows) < 0.05] = "n/a"
+        data[f"Numeric Text {i}"] = values
+
+    df = pd.DataFrame(data)
+    for col in df.columns:
+        missing = rng.random(rows) < missing_rate
+        df.loc[missing, col] = np.nan
+
+    # Overwrite a share of rows with copies of earlier rows in the block
+    duplicates = np.flatnonzero(rng.random(rows) < duplicate_rate)
+    duplicates = duplicates[duplicates > 0]
+    if len(duplicates):
+        sources = (rng.random(len(duplicates)) * duplicates).astype(np.int64)
+        df.iloc[duplicates] = df.iloc[sources].to_numpy()
+    return df
+
+
+def generate_csv(path, rows, text_cols=2, numeric_cols=2, numeric_text_cols=1,
+                 missing_rate=0.05, duplicate_rate=0.05, seed=0):
+    """Write a deterministic synthetic CSV in blocks, so 1e7 rows never sit in memory."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    for start in range(0, rows, GENERATE_BLOCK_ROWS):
+        block = generate_block(rng, start, min(GENERATE_BLOCK_ROWS, rows - start), text_cols,
+                               numeric_cols, numeric_text_cols, missing_rate, duplicate_rate)
+        block.to_csv(path, mode="w" if start == 0 else "a", header=(start == 0), index=False)
+    return path
+
+
+# -----------------------
+# Measurements
+# -----------------------
+def measure(func, setup, repeat=3):
+    """Best wall time over `repeat` runs plus tracemalloc peak bytes of one run.
+    setup() builds fresh arguments for each run and is not timed."""
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+
+    args = setup()
+    tracemalloc.start()
+    try:
+        func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run_benchmarks(csv_path, work_dir, repeat=3):
+    """Profile each cleaner function on the stage input it sees in main()."""
+    raw = cleaner.read_csv(csv_path)
+    normalized = cleaner.normalize_column_names(raw.copy())
+    detected = cleaner.auto_detect_numeric(normalized.copy())
+    filled = cleaner.fill_strings(detected.copy())
+    deduped = cleaner.remove_duplicates(filled.copy())
+    cleaned = cleaner.fill_numbers(deduped.copy())
+
+    out_csv = os.path.join(work_dir, "out", "cleaned.csv")
+    out_pretty = os.path.join(work_dir, "out", "pretty.txt")
+    cases = {
+        "read_csv": (cleaner.read_csv, lambda: (csv_path,)),
+        "auto_detect_numeric": (cleaner.auto_detect_numeric, lambda: (normalized.copy(),)),
+        "fill_strings": (cleaner.fill_strings, lambda: (detected.copy(),)),
+        "fill_numbers": (cleaner.fill_numbers, lambda: (deduped.copy(),)),
+        "remove_duplicates": (cleaner.remove_duplicates, lambda: (filled.copy(),)),
+        "save_csv": (cleaner.save_csv, lambda: (cleaned, out_csv)),
+        "save_pretty": (cleaner.save_pretty, lambda: (cleaned, out_pretty)),
+    }
+    return {name: measure(*cases[name], repeat=repeat) for name in FUNCTIONS}
+
+
+def run_startup_case(argv, trace=False):
+    code = STARTUP_CHILD.format(trace=trace, src_dir=os.path.abspath(src_dir), argv=argv,
+                                script=os.path.abspath(os.path.join(src_dir, "cleaner.py")),
+                                heavy=HEAVY_MODULES)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    seconds = time.perf_counter() - start
+    return seconds, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(repeat=5):
+    """Best wall time of each startup case over `repeat` fresh interpreters,
+    plus the tracemalloc peak and the heavy modules loaded in one traced run."""
+    results = {}
+    for name, argv in STARTUP_CASES.items():
+        best = min(run_startup_case(argv)[0] for _ in range(repeat))
+        _, traced = run_startup_case(argv, trace=True)
+        results[name] = {"seconds": best, **traced}
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def compare_results(baseline, current, time_tolerance=0.25, memory_tolerance=0.25):
+    """Return a list of regression messages (empty when everything is within tolerance)."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            regressions.append(f"{name}: missing from current results")
+            continue
+        if now["seconds"] > base["seconds"] * (1 + time_tolerance):
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> {now['seconds']:.4f}s")
+        if now["peak_bytes"] > base["peak_bytes"] * (1 + memory_tolerance):
+            regressions.append(f"{name}: peak {base['peak_bytes']} -> {now['peak_bytes']} bytes")
+    return regressions
+
+
+# -----------------------
+# CLI Wrapper
+# -----------------------
+def add_data_arguments(parser):
+    parser.add_argument("--rows", type=float, default=1e5, help="Number of rows (1e4 - 1e7)")
+    parser.add_argument("--text-cols", type=int, default=2, help="Number of text columns")
+    parser.add_argument("--numeric-cols", type=int, default=2, help="Number of numeric columns")
+    parser.add_argument("--numeric-text-cols", type=int, default=1, help="Number of numbers-stored-as-text columns")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="Share of missing cells")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Share of duplicated rows")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def data_config(args):
+    return {
+        "rows": int(args.rows),
+        "text_cols": args.text_cols,
+        "numeric_cols": args.numeric_cols,
+        "numeric_text_cols": args.numeric_text_cols,
+        "missing_rate": args.missing_rate,
+        "duplicate_rate": args.duplicate_rate,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for csv-cleaner")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic CSV")
+    generate.add_argument("path", help="Output CSV path")
+    add_data_arguments(generate)
+
+    run = commands.add_parser("run", help="Benchmark each cleaner function")
+    add_data_arguments(run)
+    run.add_argument("--repeat", type=int, default=3, help="Timed runs per function (best is kept)")
+    run.add_argument("--out", help="Write results as JSON to this path")
+
+    startup = commands.add_parser("startup", help="Benchmark import and CLI startup time")
+    startup.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per case (best is kept)")
+    startup.add_argument("--max-seconds", type=float, help="Fail when any case takes longer than this")
+    startup.add_argument("--out", help="Write results as JSON to this path")
+
+    compare = commands.add_parser("compare", help="Fail on regressions against a baseline")
+    compare.add_argument("baseline", help="Baseline results JSON")
+    compare.add_argument("current", help="Current results JSON")
+    compare.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    compare.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed peak memory growth")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_csv(args.path, **data_config(args))
+        print(f"Synthetic CSV saved to: {args.path}")
+        return
+
+    if args.command == "run":
+        config = data_config(args)
+        with tempfile.TemporaryDirectory(prefix="csvcleaner-bench-") as work_dir:
+            csv_path = generate_csv(os.path.join(work_dir, "input.csv"), **config)
+            results = run_benchmarks(csv_path, work_dir, args.repeat)
+
+        report = {"config": config, "environment": environment(), "results": results}
+        for name, result in results.items():
+            print(f"{name:<22}{result['seconds']:>10.4f}s{result['peak_bytes'] / 1024 / 1024:>10.1f} MB")
+        if args.out:
+            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults saved to: {args.out}")
+        return
+
+    if args.command == "startup":
+        results = measure_startup(args.repeat)
+        failures = []
+        for name, result in results.items():
+            print(f"{name:<22}{result['seconds']:>10.4f}s{result['peak_bytes'] / 1024 / 1024:>10.1f} MB"
+                  f"  {', '.join(result['heavy_modules']) or '-'}")
+            if result["heavy_modules"]:
+                failures.append(f"{name}: imported {', '.join(result['heavy_modules'])}")
+            if args.max_seconds is not None and result["seconds"] > args.max_seconds:
+                failures.append(f"{name}: {result['seconds']:.4f}s > {args.max_seconds}s")
+        if args.out:
+            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+            with open(args.out, "w") as f:
+                json.dump({"config": {"startup": True}, "environment": environment(), "results": results}, f, indent=2)
+            print(f"\nResults saved to: {args.out}")
+        if failures:
+            print("Startup regressions:")
+            for message in failures:
+                print(f"  {message}")
+            sys.exit(1)
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline.get("config") != current.get("config"):
+        print("Warning: baseline and current results were produced with different data configs")
+
+    regressions = compare_results(baseline, current, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("Regressions:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No regressions.")
+
+
+# -----------------------
+# Entry point
+# -----------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+In-process Python API for csv-cleaner.
+
+Services that clean many DataFrames or files can import this module once and
+call it directly instead of starting the CLI for every input. The names in
+__all__ keep their signatures between releases; the helper functions in
+cleaner.py are internal and may change.
+
+    from api import Cleaner
+
+    cleaner = Cleaner(fill_method="zero")
+    for df in frames:
+        cleaned = cleaner.clean(df)
+    cleaner.clean_csv("in.csv.gz", "out.parquet", chunksize=100_000, fmt="parquet")
+"""
+try:
+    from . import cleaner as _cleaner
+    from .formats import FORMATS, STDIO, save_output
+except ImportError:  # run as a script or with src/ on sys.path
+    import cleaner as _cleaner
+    from formats import FORMATS, STDIO, save_output
+
+__all__ = ["Cleaner", "clean", "clean_csv", "FILL_METHODS"]
+
+FILL_METHODS = ("mean", "zero", "none")
+
+
+class Cleaner:
+    """Cleaning options that can be reused for any number of inputs.
+
+    fill_value: text for missing string cells.
+    fill_method: "mean", "zero" or "none" for missing numbers.
+    numeric_columns: normalized names of the numeric columns, to skip
+        inference for feeds with a known schema (whole-DataFrame cleaning only).
+    threshold / sample_rows: numeric inference settings.
+    compact / category_threshold: store text as category or string[pyarrow].
+    """
+
+    def __init__(self, fill_value="Unknown", fill_method="mean", numeric_columns=None,
+                 threshold=_cleaner.NUMERIC_THRESHOLD, sample_rows=None, compact=False,
+                 category_threshold=_cleaner.CATEGORY_THRESHOLD):
+        if fill_method not in FILL_METHODS:
+            raise ValueError(f"fill_method must be one of {', '.join(FILL_METHODS)}, not '{fill_method}'")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be between 0 and 1")
+        self.fill_value = fill_value
+        self.fill_method = fill_method
+        self.numeric_columns = list(numeric_columns) if numeric_columns is not None else None
+        self.threshold = threshold
+        self.sample_rows = sample_rows
+        self.compact = compact
+        self.category_threshold = category_threshold
+
+    def pipeline(self, dedup=None):
+        """A fresh CleaningPipeline with these options (its report covers
+        every DataFrame it runs on)."""
+        return _cleaner.CleaningPipeline(self.fill_value, self.fill_method, dedup, self.numeric_columns,
+                                         self.threshold, self.sample_rows, compact=self.compact,
+                                         category_threshold=self.category_threshold)
+
+    def clean(self, df, copy=True, dedup=None):
+        """Return the cleaned DataFrame. With copy=False the stages may modify
+        df in place, which saves one copy of the data. Pass a shared
+        RowDeduplicator as dedup to remove duplicates across calls."""
+        if copy:
+            df = df.copy()
+        return self.pipeline(dedup).run(df)
+
+    def clean_csv(self, input_path, output_path, chunksize=None, fmt="csv", row_group_size=None,
+                  engine=None):
+        """Clean a CSV file (or "-" for stdin) into output_path and return the
+        number of rows written. With chunksize the file is streamed in chunks."""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        if not chunksize:
+            df = self.clean(_cleaner.read_csv(input_path, engine), copy=False)
+            save_output(df, output_path, fmt, row_group_size)
+            return len(df)
+
+        if input_path == STDIO:
+            stats = _cleaner.empty_stats()
+        else:
+            stats = _cleaner.collect_stats(input_path, chunksize, self.threshold, self.fill_method,
+                                           self.fill_value)
+        with _cleaner.row_deduplicator() as dedup:
+            pipeline = _cleaner.chunk_pipeline(stats, dedup, self.fill_value, self.fill_method,
+                                               compact=self.compact, category_threshold=self.category_threshold)
+            return _cleaner.stream_clean(input_path, output_path, chunksize, self.fill_value, self.fill_method,
+                                         dedup=dedup, fmt=fmt, row_group_size=row_group_size, stats=stats,
+                                         pipeline=pipeline, threshold=self.threshold)
+
+
+def clean(df, copy=True, **options):
+    """Clean one DataFrame; options are Cleaner's keyword arguments."""
+    return Cleaner(**options).clean(df, copy)
+
+
+def clean_csv(input_path, output_path, chunksize=None, fmt="csv", **options):
+    """Clean one CSV file; options are Cleaner's keyword arguments."""
+    return Cleaner(**options).clean_csv(input_path, output_path, chunksize, fmt)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Batch mode for csv-cleaner: clean every CSV in a directory or glob across a
+pool of worker processes.
+
+Each worker imports pandas once and is reused for many files, so a batch of
+thousands of files pays the interpreter and import cost once per worker
+instead of once per file. Outputs go to the same output/ layout that
+cleaner.main() derives for a single file.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from . import cleaner
+except ImportError:  # run as a script or with src/ on sys.path
+    import cleaner
+
+
+def find_inputs(target, pattern="*.csv"):
+    """Return the sorted list of files for a directory (matched with
+    `pattern`) or a glob expression."""
+    if os.path.isdir(target):
+        files = glob.glob(os.path.join(target, pattern))
+    else:
+        files = glob.glob(target, recursive=True)
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+def clean_one(input_file, fill_value="Unknown", fill_method="mean", chunksize=None, pretty=True,
+              fmt="csv", engine=None, row_group_size=None):
+    """Clean a single file in a worker process.
+
+    Returns (input_file, rows, seconds, error); error is None on success so
+    one bad file never stops the batch.
+    """
+    start = time.perf_counter()
+    try:
+        output_file, pretty_out = cleaner.default_output_paths(input_file, fmt)
+        if chunksize:
+            rows = cleaner.stream_clean(input_file, output_file, chunksize, fill_value, fill_method,
+                                        fmt=fmt, row_group_size=row_group_size)
+            if pretty:
+                cleaner.save_pretty_chunked(output_file, pretty_out, chunksize, fmt)
+        else:
+            df = cleaner.clean_dataframe(cleaner.read_csv(input_file, engine), fill_value, fill_method)
+            cleaner.save_output(df, output_file, fmt, row_group_size)
+            if pretty:
+                cleaner.save_pretty(df, pretty_out)
+            rows = len(df)
+        return input_file, rows, time.perf_counter() - start, None
+    except Exception as e:
+        return input_file, 0, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def run_batch(files, workers=None, fill_value="Unknown", fill_method="mean", chunksize=None, pretty=True,
+              fmt="csv", engine=None, row_group_size=None):
+    """Clean `files` over a ProcessPoolExecutor and return the per-file
+    results in completion order."""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(clean_one, f, fill_value, fill_method, chunksize, pretty, fmt, engine, row_group_size)
+            for f in files
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+def print_summary(results, elapsed, out=sys.stdout):
+    failures = [r for r in results if r[3] is not None]
+    rows = sum(r[1] for r in results)
+
+    for input_file, file_rows, seconds, error in sorted(results):
+        status = "FAILED" if error else "ok"
+        out.write(f"{status:<7}{seconds:8.3f}s  {file_rows:>10} rows  {input_file}\n")
+
+    out.write("-" * 60 + "\n")
+    out.write(f"Files: {len(results)}  ok: {len(results) - len(failures)}  failed: {len(failures)}\n")
+    out.write(f"Rows: {rows}  wall time: {elapsed:.2f}s")
+    if elapsed > 0:
+        out.write(f"  ({len(results) / elapsed:.1f} files/s)")
+    out.write("\n")
+    for input_file, _, _, error in failures:
+        out.write(f"  {input_file}: {error}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean a directory or glob of CSV files in parallel")
+    parser.add_argument("target", help="Directory or glob of input CSV files (e.g. 'data/input/*.csv')")
+    parser.add_argument("--pattern", default="*.csv", help="File pattern when target is a directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes")
+    parser.add_argument("--fill-strings", default="Unknown", help="Fill missing string values with this")
+    parser.add_argument("--fill-numbers", choices=["mean", "zero", "none"], default="mean", help="How to fill missing numeric values")
+    parser.add_argument("--chunksize", type=int, help="Stream each file in chunks of this many rows")
+    parser.add_argument("--format", choices=cleaner.FORMATS, default="csv", help="Output format for the cleaned data")
+    parser.add_argument("--engine", choices=["c", "python", "pyarrow"], help="CSV reader engine for whole-file cleaning")
+    parser.add_argument("--row-group-size", type=int, help="Rows per Parquet row group / Feather record batch")
+    parser.add_argument("--no-pretty", action="store_true", help="Skip writing pretty ASCII tables")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    files = find_inputs(args.target, args.pattern)
+    if not files:
+        raise FileNotFoundError(f"No input files match '{args.target}'")
+
+    start = time.perf_counter()
+    results = run_batch(files, args.workers, args.fill_strings, args.fill_numbers,
+                        args.chunksize, not args.no_pretty, args.format, args.engine, args.row_group_size)
+    print_summary(results, time.perf_counter() - start)
+
+    if any(r[3] is not None for r in results):
+        sys.exit(1)
+
+# -----------------------
+# Entry point
+# -----------------------
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
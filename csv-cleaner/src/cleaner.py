@@ -1,80 +1,260 @@
 #!/usr/bin/env python3
-import pandas as pd
-import numpy as np
 import argparse
 import os
 import sys
 
+try:
+    from .formats import (FORMATS, STDIO, ChunkWriter, iter_output_chunks, open_input, output_extension,
+                          require_pyarrow, save_output, split_compression)
+    from .instrumentation import Profiler, file_size
+    from .schema import SchemaCache, read_header, schema_key
+except ImportError:  # run as a script or with src/ on sys.path
+    from formats import (FORMATS, STDIO, ChunkWriter, iter_output_chunks, open_input, output_extension,
+                         require_pyarrow, save_output, split_compression)
+    from instrumentation import Profiler, file_size
+    from schema import SchemaCache, read_header, schema_key
+
+# pandas and NumPy are imported inside the functions that use them, so the
+# CLI can parse arguments, print --help and report bad paths without paying
+# for those imports.
+
 # -----------------------
 # CSV Cleaner Functions
 # -----------------------
-def pretty_print(df):
-    df_str = df.copy()
-    
-    for col in df_str.columns:
-        if pd.api.types.is_integer_dtype(df_str[col]):
-            df_str[col] = df_str[col].astype(int).astype(str)
-        elif pd.api.types.is_float_dtype(df_str[col]):
-            # If value is exactly an integer, show as int
-            df_str[col] = df_str[col].apply(lambda x: str(int(x)) if x == int(x) else f"{x:.2f}")
-        else:
-            df_str[col] = df_str[col].astype(str)
+NUMERIC_THRESHOLD = 0.8
+INFERENCE_BLOCK_ROWS = 1024
+CATEGORY_THRESHOLD = 1000
+# Rows a cached schema is re-checked on before it is trusted
+SCHEMA_CHECK_ROWS = 1000
+
+RENDER_BLOCK_ROWS = 10000
+
+
+def format_column(series, float_format=True):
+    """Return a column as a NumPy array of display strings, converted as a
+    whole column instead of cell by cell. With float_format, whole floats
+    show as ints and other floats with two decimals."""
+    import pandas as pd
+    import numpy as np
+    if pd.api.types.is_float_dtype(series) and float_format:
+        values = series.to_numpy(dtype="float64")
+        whole = np.isfinite(values) & (values % 1 == 0)
+        text = np.char.mod("%.2f", values)
+        text[whole] = values[whole].astype(np.int64).astype(str)
+        return text
+    if pd.api.types.is_integer_dtype(series):
+        return series.to_numpy().astype(str)
+    return series.to_numpy(dtype=object).astype(str)
+
+
+def render_table(df, out, float_format=True, head_rows=None):
+    """Write df as a padded ASCII table to the file-like `out`.
+
+    Column widths come from whole-column string lengths, and rows are padded
+    and joined one block of RENDER_BLOCK_ROWS at a time, so each block is a
+    single write. With head_rows, only the first and last head_rows rows are
+    shown, separated by a '...' line.
+    """
+    import numpy as np
+    columns = list(df.columns)
+    if head_rows is not None and len(df) > 2 * head_rows:
+        parts = [df.iloc[:head_rows], df.iloc[len(df) - head_rows:]]
+    else:
+        parts = [df]
 
-    col_widths = {col: max(df_str[col].map(len).max(), len(col)) + 2 for col in df_str.columns}
-    header = "".join(col.ljust(col_widths[col]) for col in df_str.columns)
-    print(header)
-    print("-" * sum(col_widths.values()))
-    for _, row in df_str.iterrows():
-        line = "".join(str(row[col]).ljust(col_widths[col]) for col in df_str.columns)
-        print(line)
+    formatted = [[format_column(part[col], float_format) for col in columns] for part in parts]
+    widths = [
+        max([len(str(col))] + [int(np.char.str_len(cols[i]).max(initial=0)) for cols in formatted]) + 2
+        for i, col in enumerate(columns)
+    ]
 
+    out.write("".join(str(col).ljust(w) for col, w in zip(columns, widths)) + "\n")
+    out.write("-" * sum(widths) + "\n")
+    for n, cols in enumerate(formatted):
+        if n:
+            out.write("...\n")
+        rows = len(cols[0]) if cols else 0
+        for start in range(0, rows, RENDER_BLOCK_ROWS):
+            lines = None
+            for values, width in zip(cols, widths):
+                padded = np.char.ljust(values[start:start + RENDER_BLOCK_ROWS], width)
+                lines = padded if lines is None else np.char.add(lines, padded)
+            out.write("\n".join(lines.tolist()) + "\n")
 
-def read_csv(file_path):
+
+def pretty_print(df, preview_rows=None, out=None):
+    render_table(df, out or sys.stdout, head_rows=preview_rows)
+
+
+def read_csv(file_path, engine=None, dtype=None):
+    """Read a whole CSV. Compressed files are decompressed by pandas based on
+    their extension; "-" reads (possibly compressed) standard input."""
+    import pandas as pd
+    if file_path == STDIO:
+        return pd.read_csv(open_input(STDIO), engine=engine, dtype=dtype)
     if not os.path.isfile(file_path):
         raise FileNotFoundError(f"Input file '{file_path}' does not exist!")
-    return pd.read_csv(file_path)
+    # engine="pyarrow" parses with multiple threads; None keeps pandas' C parser
+    if engine == "pyarrow":
+        require_pyarrow("The pyarrow reader")
+    return pd.read_csv(file_path, engine=engine, dtype=dtype)
 
 def normalize_column_names(df):
     df.columns = [col.strip().replace(" ","_").lower() for col in df.columns]
     return df
 
-def auto_detect_numeric(df):
-    for col in df.select_dtypes(include=['object']):
-        converted = pd.to_numeric(df[col], errors='coerce')
-        num_non_na = converted.notna().sum()
-        total_non_empty = df[col].replace(['', 'nan', 'NaN'], np.nan).notna().sum()
-        if total_non_empty > 0 and num_non_na / total_non_empty >= 0.8:
-            df[col] = converted
+def numeric_ratio(values, threshold=NUMERIC_THRESHOLD):
+    """Share of non-empty values that convert to numbers.
+
+    Values are checked in growing blocks, and the scan stops as soon as the
+    column cannot reach `threshold` even if every remaining value converted,
+    so text columns usually cost one small block. Returns (ratio, converted),
+    where converted is the full numeric Series when every value was scanned
+    and None after an early exit.
+    """
+    import pandas as pd
+    numeric = non_empty = 0
+    blocks = []
+    start, block = 0, INFERENCE_BLOCK_ROWS
+    while start < len(values):
+        part = values.iloc[start:start + block]
+        converted = pd.to_numeric(part, errors='coerce')
+        blocks.append(converted)
+        numeric += int(converted.notna().sum())
+        non_empty += int((part.notna() & ~part.isin(['', 'nan', 'NaN'])).sum())
+        start += block
+        block *= 2
+
+        remaining = max(len(values) - start, 0)
+        if non_empty + remaining > 0 and (numeric + remaining) / (non_empty + remaining) < threshold:
+            return numeric / non_empty if non_empty else 0.0, None
+
+    ratio = numeric / non_empty if non_empty else 0.0
+    return ratio, pd.concat(blocks) if blocks else pd.to_numeric(values, errors='coerce')
+
+
+def is_boolean(values):
+    """True for a True/False column, also when missing values made it object.
+    pd.to_numeric would turn those into 1/0, but they are not numbers."""
+    import pandas as pd
+    return pd.api.types.is_bool_dtype(values) or pd.api.types.infer_dtype(values, skipna=True) == "boolean"
+
+
+def auto_detect_numeric(df, threshold=NUMERIC_THRESHOLD, sample_rows=None):
+    """Convert text columns where at least `threshold` of the non-empty values
+    are numbers. With sample_rows, the decision is made on an evenly spaced
+    sample of that many rows and only chosen columns are converted in full.
+    True/False columns are never numeric."""
+    import pandas as pd
+    for col in text_columns(df):
+        values = df[col]
+        if is_boolean(values):
+            continue
+        sampled = bool(sample_rows) and len(values) > sample_rows
+        if sampled:
+            values = values.iloc[::len(values) // sample_rows].iloc[:sample_rows]
+        ratio, converted = numeric_ratio(values, threshold)
+        if ratio >= threshold:
+            df[col] = pd.to_numeric(df[col], errors='coerce') if sampled else converted
     return df
 
-def fill_strings(df, fill_value="Unknown"):
-    for col in df.select_dtypes(include=['object']):
-        # Replace NaN / None first
-        df[col] = df[col].replace([None, '', 'nan', 'NaN'], fill_value)
-        # Strip strings (only for non-null entries)
-        df[col] = df[col].astype(str).str.strip()
+
+def apply_numeric_columns(df, numeric_columns):
+    """Convert known numeric columns (e.g. from the schema cache) without inference."""
+    import pandas as pd
+    for col in numeric_columns:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
     return df
 
+def text_columns(df):
+    """Names of the text columns (object, or pandas' string dtypes)."""
+    return list(df.select_dtypes(include=['object', 'string']).columns)
 
-def fill_numbers(df, method="mean"):
-    for col in df.select_dtypes(include=[np.number]):
-        if method == "mean":
-            df[col] = df[col].fillna(df[col].mean())
-        elif method == "zero":
-            df[col] = df[col].fillna(0)
-
-        # Round all numbers to 0 decimals if they are effectively integers
-        non_nan_values = df[col].dropna()
-        if (non_nan_values % 1 == 0).all():  # all whole numbers
-            df[col] = df[col].astype(int)
+
+def compact_string_dtype():
+    """string[pyarrow] when pyarrow is installed, else pandas' own string dtype."""
+    try:
+        import pyarrow  # noqa: F401
+        return "string[pyarrow]"
+    except ImportError:
+        return "string"
+
+
+def fill_strings(df, fill_value="Unknown", compact=False, category_threshold=CATEGORY_THRESHOLD, kinds=None):
+    """Fill missing text and strip whitespace.
+
+    With compact=True, columns with at most category_threshold distinct
+    values become `category` and the rest `string[pyarrow]`, built straight
+    from the codes so no object array of Python strings is created. Pass the
+    same `kinds` dict for every chunk of a file so each column keeps the kind
+    chosen for the first chunk.
+    """
+    import pandas as pd
+    import numpy as np
+    for col in text_columns(df) + (list(df.select_dtypes(include=['category']).columns) if compact else []):
+        # One fused pass: replace None/NaN/''/'nan'/'NaN' with fill_value and
+        # strip everything else. Each distinct value is cleaned once and the
+        # result is gathered back by code, so repeated values cost nothing.
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=True)
+        cleaned = [
+            fill_value if u in ('', 'nan', 'NaN') else u.strip() if isinstance(u, str) else str(u).strip()
+            for u in uniques
+        ]
+        cleaned.append(fill_value)  # code -1 (None / NaN) picks the last entry
+
+        if not compact:
+            df[col] = pd.Series(np.array(cleaned, dtype=object)[codes], index=df.index, dtype=str)
+            continue
+
+        kind = kinds.get(col) if kinds is not None else None
+        if kind is None:
+            kind = "category" if len(cleaned) <= category_threshold else "string"
+            if kinds is not None:
+                kinds[col] = kind
+        if kind == "category":
+            # Stripping can merge values (' a' and 'a'), so map the cleaned
+            # uniques to their own distinct categories before rebuilding
+            value_codes, categories = pd.factorize(pd.Index(cleaned))
+            df[col] = pd.Categorical.from_codes(value_codes[codes], categories=categories)
         else:
-            df[col] = df[col].round(0).astype(int)  # force rounding to int
+            values = pd.array(np.array(cleaned, dtype=object)[codes], dtype=compact_string_dtype())
+            df[col] = pd.Series(values, index=df.index)
     return df
 
 
+def fill_numbers(df, method="mean", means=None):
+    import numpy as np
+    for col in df.select_dtypes(include=[np.number]):
+        series = df[col]
+        if series.dtype == np.int64:
+            continue  # no missing values and nothing to round
+
+        # Fill, round and cast on one float buffer instead of fillna -> dropna -> % 1 -> astype
+        values = series.to_numpy(dtype="float64", na_value=np.nan, copy=True)
+        missing = np.isnan(values)
+        if missing.any():
+            if method == "mean":
+                # Streaming mode passes column means collected over the whole file
+                values[missing] = means[col] if means is not None and col in means else series.mean()
+            elif method == "zero":
+                values[missing] = 0
+
+        # Whole numbers are unchanged by rounding, so one round covers both cases
+        np.round(values, out=values)
+        if not np.isfinite(values).all():
+            raise ValueError(f"Cannot convert non-finite values (NA or inf) to integer in column '{col}'")
+        df[col] = values.astype(np.int64)
+    return df
+
 
-def remove_duplicates(df):
-    return df.drop_duplicates()
+def remove_duplicates(df, dedup=None):
+    # A shared RowDeduplicator removes duplicates across chunks and files
+    if dedup is not None:
+        return dedup.filter(df)
+    duplicated = df.duplicated()
+    # Only copy when there is something to drop
+    return df[~duplicated] if duplicated.any() else df
 
 def save_csv(df, output_path):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -82,67 +262,668 @@ def save_csv(df, output_path):
 
 def save_pretty(df, output_path):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w") as f:
-        col_widths = {col: max(df[col].astype(str).map(len).max(), len(col)) + 2 for col in df.columns}
-        header = "".join(col.ljust(col_widths[col]) for col in df.columns)
-        f.write(header + "\n")
-        f.write("-" * sum(col_widths.values()) + "\n")
-        for _, row in df.iterrows():
-            line = "".join(str(row[col]).ljust(col_widths[col]) for col in df.columns)
-            f.write(line + "\n")
+    with open(output_path, "w", buffering=1024 * 1024) as f:
+        render_table(df, f, float_format=False)
 
 # -----------------------
-# CLI Wrapper
+# Cleaning pipeline
 # -----------------------
-def main():
-    parser = argparse.ArgumentParser(description="Pro-level Generic CSV Cleaner")
-    parser.add_argument("--in", dest="input_file", required=True, help="Input CSV file path")
-    parser.add_argument("--out", dest="output_file", help="Output CSV file path")
-    parser.add_argument("--fill-strings", default="Unknown", help="Fill missing string values with this")
-    parser.add_argument("--fill-numbers", choices=["mean", "zero", "none"], default="mean", help="How to fill missing numeric values")
-    parser.add_argument("--preview", action="store_true", help="Preview only; do not save")
-    parser.add_argument("--pretty-out", help="Save a pretty ASCII table to a file")
-    args = parser.parse_args()
+class CleaningPipeline:
+    """The cleaning stages as one ordered plan.
+
+    Stages run in place on the same DataFrame where the stage allows it.
+    Each run adds wall time, rows in/out and (with track_memory) the peak
+    bytes allocated per stage to `report`, accumulating across chunks.
+    Memory tracking uses tracemalloc, which NumPy reports its buffers to;
+    it slows Python allocations, so it is off by default.
+    """
+
+    def __init__(self, fill_value="Unknown", fill_method="mean", dedup=None, numeric_columns=None,
+                 threshold=NUMERIC_THRESHOLD, sample_rows=None, means=None, track_memory=False,
+                 compact=False, category_threshold=CATEGORY_THRESHOLD):
+        self.fill_value = fill_value
+        self.fill_method = fill_method
+        self.dedup = dedup
+        self.numeric_columns = numeric_columns
+        self.threshold = threshold
+        self.sample_rows = sample_rows
+        self.means = means
+        self.track_memory = track_memory
+        self.compact = compact
+        self.category_threshold = category_threshold
+        self.kinds = {}  # compact dtype chosen per column, shared by all chunks
+        self.stages = self.plan()
+        self.report = {name: {"seconds": 0.0, "bytes": 0, "rows_in": 0, "rows_out": 0, "calls": 0}
+                       for name, _ in self.stages}
+
+    def plan(self):
+        stages = [("normalize_column_names", normalize_column_names)]
+        if self.numeric_columns is not None:
+            stages.append(("apply_numeric_columns", lambda df: apply_numeric_columns(df, self.numeric_columns)))
+        else:
+            stages.append(("auto_detect_numeric", lambda df: auto_detect_numeric(df, self.threshold, self.sample_rows)))
+        stages.append(("fill_strings", lambda df: fill_strings(
+            df, self.fill_value, self.compact, self.category_threshold, self.kinds)))
+        stages.append(("remove_duplicates", lambda df: remove_duplicates(df, self.dedup)))
+        if self.fill_method != "none":
+            stages.append(("fill_numbers", lambda df: fill_numbers(df, self.fill_method, self.means)))
+        return stages
+
+    def run(self, df):
+        import time
+        import tracemalloc
+
+        tracking = self.track_memory and not tracemalloc.is_tracing()
+        if tracking:
+            tracemalloc.start()
+        try:
+            for name, stage in self.stages:
+                entry = self.report[name]
+                rows_in = len(df)
+                if self.track_memory:
+                    tracemalloc.reset_peak()
+                    before = tracemalloc.get_traced_memory()[0]
+                start = time.perf_counter()
+                df = stage(df)
+                entry["seconds"] += time.perf_counter() - start
+                if self.track_memory:
+                    entry["bytes"] += tracemalloc.get_traced_memory()[1] - before
+                entry["rows_in"] += rows_in
+                entry["rows_out"] += len(df)
+                entry["calls"] += 1
+        finally:
+            if tracking:
+                tracemalloc.stop()
+        return df
+
+    def format_report(self):
+        lines = [f"{'stage':<24}{'seconds':>10}{'alloc MB':>12}{'rows in':>12}{'rows out':>12}"]
+        for name, entry in self.report.items():
+            alloc = f"{entry['bytes'] / 1024 / 1024:.2f}" if self.track_memory else "-"
+            lines.append(f"{name:<24}{entry['seconds']:>10.4f}{alloc:>12}{entry['rows_in']:>12}{entry['rows_out']:>12}")
+        return "\n".join(lines)
+
+
+def row_deduplicator(*args, **kwargs):
+    """Create a RowDeduplicator; dedup needs NumPy and pandas, so it is
+    imported on first use."""
+    try:
+        from .dedup import RowDeduplicator
+    except ImportError:  # run as a script or with src/ on sys.path
+        from dedup import RowDeduplicator
+    return RowDeduplicator(*args, **kwargs)
+
+
+def clean_dataframe(df, fill_value="Unknown", fill_method="mean", dedup=None,
+                    numeric_columns=None, threshold=NUMERIC_THRESHOLD, sample_rows=None, compact=False):
+    """Run the in-memory cleaning stages in order and return the cleaned df.
+    Pass numeric_columns (normalized names) to skip numeric inference."""
+    pipeline = CleaningPipeline(fill_value, fill_method, dedup, numeric_columns, threshold, sample_rows,
+                                compact=compact)
+    return pipeline.run(df)
+
+# -----------------------
+# Chunked streaming
+# -----------------------
+
+def read_csv_chunks(file_path, chunksize, **kwargs):
+    import pandas as pd
+    if file_path == STDIO:
+        return pd.read_csv(open_input(STDIO), chunksize=chunksize, **kwargs)
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"Input file '{file_path}' does not exist!")
+    return pd.read_csv(file_path, chunksize=chunksize, **kwargs)
+
+
+def count_chunks(chunks, counts=None):
+    """Accumulate per-column counts and sums over raw chunks.
+
+    The result is mergeable: counting more chunks into an existing counts
+    dict gives the same totals as counting everything at once, which is what
+    incremental runs rely on. stats_from_counts() turns it into stats.
+    """
+    import pandas as pd
+    import numpy as np
+    if counts is None:
+        counts = {"columns": None, "text_seen": {}, "numeric_counts": {}, "non_empty_counts": {}, "sums": {}}
+    text_seen = counts["text_seen"]
+    numeric_counts = counts["numeric_counts"]
+    non_empty_counts = counts["non_empty_counts"]
+    sums = counts["sums"]
+
+    for chunk in chunks:
+        if counts["columns"] is None:
+            counts["columns"] = list(chunk.columns)
+            for col in counts["columns"]:
+                text_seen[col] = False
+                numeric_counts[col] = non_empty_counts[col] = 0
+                sums[col] = 0.0
+
+        for col in counts["columns"]:
+            values = chunk[col]
+            if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+                converted = values
+                non_empty = values.notna().sum()
+            else:
+                text_seen[col] = True
+                # True/False count as text: the chunks are read back as str
+                converted = (pd.Series(np.nan, index=values.index) if is_boolean(values)
+                             else pd.to_numeric(values, errors="coerce"))
+                non_empty = values.replace(['', 'nan', 'NaN'], np.nan).notna().sum()
+            numeric_counts[col] += int(converted.notna().sum())
+            non_empty_counts[col] += int(non_empty)
+            sums[col] += float(converted.sum())
+    return counts
+
 
-    base_dir, input_filename = os.path.split(args.input_file)
-    name, ext = os.path.splitext(input_filename)
+def stats_from_counts(counts, threshold=NUMERIC_THRESHOLD):
+    """Decide the numeric columns and their means from count_chunks() totals."""
+    import pandas as pd
+    columns = counts["columns"]
+    if columns is None:
+        return {"columns": [], "text_columns": [], "numeric": [], "means": {}}
+
+    text_seen = counts["text_seen"]
+    numeric_counts = counts["numeric_counts"]
+    numeric = []
+    means = {}
+    for col in columns:
+        if not text_seen[col]:
+            is_numeric = True
+        else:
+            total = counts["non_empty_counts"][col]
+            is_numeric = total > 0 and numeric_counts[col] / total >= threshold
+        if is_numeric:
+            name = normalize_column_names(pd.DataFrame(columns=[col])).columns[0]
+            numeric.append(name)
+            if numeric_counts[col]:
+                means[name] = counts["sums"][col] / numeric_counts[col]
+
+    return {
+        "columns": columns,
+        # Raw header names that must be read as text so dtypes agree across chunks
+        "text_columns": [col for col in columns if text_seen[col]],
+        "numeric": numeric,
+        "means": means,
+    }
+
+
+def collect_stats(file_path, chunksize, threshold=NUMERIC_THRESHOLD, fill_method="mean", fill_value="Unknown",
+                  **dedup_options):
+    """First pass over the file: decide which columns are numeric, one chunk
+    at a time. With fill_method="mean", a second pass collects the column
+    means (see deduplicated_means).
+
+    A column is numeric when pandas parsed it as a number in every chunk, or
+    when at least `threshold` of its non-empty values convert, counted
+    over the whole file so every chunk agrees on the same decision.
+    """
+    stats = stats_from_counts(count_chunks(read_csv_chunks(file_path, chunksize)), threshold)
+    if fill_method == "mean" and stats["numeric"]:
+        stats["means"] = deduplicated_means(file_path, chunksize, stats, fill_value, **dedup_options)
+    return stats
+
+
+def deduplicated_means(file_path, chunksize, stats, fill_value="Unknown", **dedup_options):
+    """Means of the numeric columns over the rows that survive fill_strings
+    and duplicate removal, the same rows the in-memory pipeline computes its
+    means from. Duplicates are tracked with a RowDeduplicator of its own
+    (dedup_options are its arguments), so only duplicates within this file
+    are left out."""
+    numeric = stats["numeric"]
+    sums = dict.fromkeys(numeric, 0.0)
+    counts = dict.fromkeys(numeric, 0)
+    dtype = {col: str for col in stats["text_columns"]}
+    with row_deduplicator(**dedup_options) as dedup:
+        for chunk in read_csv_chunks(file_path, chunksize, dtype=dtype):
+            chunk = apply_numeric_columns(normalize_column_names(chunk), numeric)
+            chunk = dedup.filter(fill_strings(chunk, fill_value))
+            for col in numeric:
+                sums[col] += float(chunk[col].sum())
+                counts[col] += int(chunk[col].notna().sum())
+    return {col: sums[col] / counts[col] for col in numeric if counts[col]}
+
+
+def empty_stats():
+    return {"columns": [], "text_columns": [], "numeric": [], "means": {}}
+
+
+def running_chunks(chunks, stats, threshold=NUMERIC_THRESHOLD):
+    """Single-pass stand-in for collect_stats for input that can only be read
+    once, such as standard input. Chunks should be read as text.
+
+    The first chunk decides the numeric columns. Before each chunk is yielded,
+    stats["means"] is updated in place to the means of every row read so far,
+    so a pipeline built from the same stats fills with running means.
+    """
+    counts = None
+    for chunk in chunks:
+        counts = count_chunks([chunk], counts)
+        current = stats_from_counts(counts, threshold)
+        if not stats["columns"]:
+            stats["columns"] = current["columns"]
+            stats["numeric"][:] = current["numeric"]
+        stats["means"].update({col: mean for col, mean in current["means"].items() if col in stats["numeric"]})
+        yield chunk
+
+
+def chunk_pipeline(stats, dedup, fill_value="Unknown", fill_method="mean", track_memory=False,
+                   compact=False, category_threshold=CATEGORY_THRESHOLD):
+    """Pipeline for streaming chunks: numeric columns and means come from stats."""
+    return CleaningPipeline(fill_value, fill_method, dedup, numeric_columns=stats["numeric"],
+                            means=stats["means"], track_memory=track_memory,
+                            compact=compact, category_threshold=category_threshold)
+
+
+def clean_chunk(chunk, stats, dedup, fill_value="Unknown", fill_method="mean"):
+    return chunk_pipeline(stats, dedup, fill_value, fill_method).run(chunk)
+
+
+def stream_clean(input_path, output_path, chunksize, fill_value="Unknown", fill_method="mean",
+                 preview=False, dedup=None, fmt="csv", row_group_size=None, stats=None, pipeline=None,
+                 threshold=NUMERIC_THRESHOLD):
+    """Clean a CSV in fixed-size chunks so peak memory is bounded by the
+    chunk size rather than the file size.
+
+    Runs a first pass (collect_stats) for numeric detection and column means,
+    then cleans and appends each chunk to output_path. Like the in-memory
+    path, column means leave out rows dropped as duplicates.
+    With preview=True only the first cleaned chunk is returned and nothing is
+    written. Pass a shared RowDeduplicator as dedup to remove duplicates
+    across several files. fmt picks csv, parquet (one row group per chunk,
+    split at row_group_size) or feather output. Pass precomputed stats (e.g.
+    from the schema cache) to skip the first pass, and a pipeline built with
+    chunk_pipeline() to collect its per-stage report. Returns the number of
+    rows written (or the preview DataFrame).
+
+    Standard input ("-") cannot be read twice, so it is cleaned in a single
+    pass (see running_chunks): pass stats=None or empty_stats() for it.
+    """
+    import pandas as pd
+    if dedup is None and pipeline is None:
+        with row_deduplicator() as own_dedup:
+            return stream_clean(input_path, output_path, chunksize, fill_value, fill_method,
+                                preview, own_dedup, fmt, row_group_size, stats, threshold=threshold)
+
+    if stats is None:
+        stats = (empty_stats() if input_path == STDIO
+                 else collect_stats(input_path, chunksize, threshold, fill_method, fill_value))
+    if pipeline is None:
+        pipeline = chunk_pipeline(stats, dedup, fill_value, fill_method)
+    if input_path == STDIO and not stats["columns"]:
+        chunks = running_chunks(read_csv_chunks(STDIO, chunksize, dtype=str), stats, threshold)
+    else:
+        dtype = {col: str for col in stats["text_columns"]}
+        chunks = read_csv_chunks(input_path, chunksize, dtype=dtype)
+
+    if preview:
+        for chunk in chunks:
+            return pipeline.run(chunk)
+        return pd.DataFrame()
+
+    with ChunkWriter(output_path, fmt, row_group_size) as writer:
+        for chunk in chunks:
+            chunk = pipeline.run(chunk)
+            if fmt != "csv" and fill_method == "none":
+                # Unfilled numeric columns are int in some chunks and float in
+                # others; fix them to float so every chunk has one Arrow schema
+                chunk = chunk.astype({col: "float64" for col in stats["numeric"]})
+            writer.write(chunk)
+    return writer.rows
+
+
+def save_pretty_chunked(cleaned_path, output_path, chunksize, fmt="csv"):
+    """Write the pretty table for a cleaned output file in two chunked
+    passes: one to measure column widths, one to render."""
+    import numpy as np
+    col_widths = {}
+    for chunk in iter_output_chunks(cleaned_path, fmt, chunksize):
+        for col in chunk.columns:
+            width = int(np.char.str_len(format_column(chunk[col])).max(initial=0))
+            col_widths[col] = max(col_widths.get(col, 0), width, len(col))
+
+    # Pad every chunk to the file-wide widths with the same block renderer
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", buffering=1024 * 1024) as f:
+        f.write("".join(col.ljust(w + 2) for col, w in col_widths.items()) + "\n")
+        f.write("-" * sum(w + 2 for w in col_widths.values()) + "\n")
+        for chunk in iter_output_chunks(cleaned_path, fmt, chunksize):
+            lines = None
+            for col in chunk.columns:
+                padded = np.char.ljust(format_column(chunk[col]), col_widths[col] + 2)
+                lines = padded if lines is None else np.char.add(lines, padded)
+            if lines is not None and len(lines):
+                f.write("\n".join(lines.tolist()) + "\n")
+
+# -----------------------
+# Schema cache
+# -----------------------
+def schema_from_dataframe(raw_columns, raw_dtypes, cleaned, source=""):
+    """Build a schema cache entry from the raw header/dtypes and the cleaned df."""
+    import pandas as pd
+    numeric = [col for col in cleaned.columns
+               if pd.api.types.is_numeric_dtype(cleaned[col]) and not pd.api.types.is_bool_dtype(cleaned[col])]
+    dtype = {}
+    for raw, name, raw_dtype in zip(raw_columns, cleaned.columns, raw_dtypes):
+        if pd.api.types.is_object_dtype(raw_dtype) or pd.api.types.is_string_dtype(raw_dtype):
+            dtype[raw] = "str"
+        else:
+            dtype[raw] = str(raw_dtype)
+    return {"source": source, "columns": list(raw_columns), "numeric": numeric, "dtype": dtype}
+
+
+def schema_from_stats(stats, source=""):
+    return {"source": source, "columns": stats["columns"], "numeric": stats["numeric"],
+            "dtype": {col: "str" for col in stats["text_columns"]}}
+
+
+def schema_matches(df, numeric_columns, threshold=NUMERIC_THRESHOLD, sample_rows=SCHEMA_CHECK_ROWS):
+    """True when the cached numeric columns of a raw df still pass the
+    numeric threshold on an evenly spaced sample of sample_rows rows, so a
+    feed that drifted to text is inferred again instead of coerced to NaN."""
+    import pandas as pd
+    names = dict(zip(normalize_column_names(pd.DataFrame(columns=df.columns)).columns, df.columns))
+    for name in numeric_columns:
+        if name not in names:
+            continue
+        values = df[names[name]]
+        if is_boolean(values):
+            return False
+        if pd.api.types.is_numeric_dtype(values):
+            continue
+        if len(values) > sample_rows:
+            values = values.iloc[::len(values) // sample_rows].iloc[:sample_rows]
+        if numeric_ratio(values, threshold)[0] < threshold:
+            return False
+    return True
+
+
+def stats_from_schema(entry):
+    """Streaming stats from a cached entry; means are not cached."""
+    return {"columns": entry["columns"],
+            "text_columns": [col for col, dtype in entry["dtype"].items() if dtype == "str"],
+            "numeric": entry["numeric"], "means": {}}
+
+# -----------------------
+# CLI Wrapper
+# -----------------------
+def default_output_paths(input_file, fmt="csv"):
+    """Return (cleaned_file, pretty_txt) paths in the output/ folder next to
+    the input's folder, e.g. samples/input/x.csv -> samples/output/x_cleaned.csv
+    (x_cleaned.parquet / .feather for the columnar formats). Compressed CSV
+    keeps its compression: x.csv.gz -> x_cleaned.csv.gz. Standard input
+    ("-") defaults to standard output and no pretty table."""
+    if input_file == STDIO:
+        return STDIO, None
+    base_dir, input_filename = os.path.split(input_file)
+    stem, compression = split_compression(input_filename)
+    name, ext = os.path.splitext(stem)
+    if fmt == "csv" and compression:
+        ext += input_filename[len(stem):]
 
     # Default output folder: samples/output/ relative to the input file
     parent_dir = os.path.dirname(base_dir)  # samples/
     default_output_dir = os.path.join(parent_dir, "output")
     os.makedirs(default_output_dir, exist_ok=True)
 
-    if not args.output_file:
-        args.output_file = os.path.join(default_output_dir, f"{name}_cleaned{ext}")
+    return (os.path.join(default_output_dir, f"{name}_cleaned{output_extension(fmt, ext)}"),
+            os.path.join(default_output_dir, f"{name}_pretty.txt"))
+
+
+def add_pipeline_report(profiler, pipeline):
+    """Copy a pipeline's per-stage report into a Profiler as pipeline.<stage>."""
+    for name, entry in pipeline.report.items():
+        profiler.add(f"pipeline.{name}", entry["seconds"], entry["rows_in"], calls=entry["calls"])
+
+
+def clean_file(input_file, args, dedup=None, cache=None, profiler=None):
+    profiler = profiler or Profiler("csv-cleaner")
+    default_output, default_pretty = default_output_paths(input_file, args.format)
+    output_file = args.output_file or default_output
+    pretty_out = args.pretty_out
+    # Keep standard output clean for the data when it is the destination
+    console = sys.stderr if output_file == STDIO else sys.stdout
+
+    if args.incremental:
+        try:
+            from .incremental import INCREMENTAL_CHUNKSIZE, incremental_clean
+        except ImportError:  # run as a script or with src/ on sys.path
+            from incremental import INCREMENTAL_CHUNKSIZE, incremental_clean
+        chunksize = args.chunksize or INCREMENTAL_CHUNKSIZE
+        with profiler.stage("incremental_clean") as stage:
+            written_before = file_size(output_file)
+            rows, reason = incremental_clean(input_file, output_file, chunksize, args.fill_strings,
+                                             args.fill_numbers, args.checkpoint, args.numeric_threshold,
+                                             args.dedup_memory * 1024 * 1024, args.dedup_bits, args.spill_dir,
+                                             args.compact_strings, args.category_threshold)
+            stage["rows"] += rows
+            stage["bytes_written"] += max(file_size(output_file) - written_before, 0) if reason is None \
+                else file_size(output_file)
+        if reason is None:
+            print(f"Appended {rows} new rows to: {output_file}")
+        else:
+            print(f"Rebuilt {output_file} ({reason}): {rows} rows")
+        if pretty_out:
+            with profiler.stage("save_pretty") as stage:
+                save_pretty_chunked(output_file, pretty_out, chunksize)
+                stage["bytes_written"] += file_size(pretty_out)
+            print(f"Pretty table saved to: {pretty_out}")
+        return
+
+    key = entry = None
+    if cache is not None:
+        if not os.path.isfile(input_file):
+            raise FileNotFoundError(f"Input file '{input_file}' does not exist!")
+        source = args.source or os.path.basename(input_file)
+        key = schema_key(read_header(input_file), source)
+        entry = cache.get(key)
 
-    if not args.pretty_out:
-        args.pretty_out = os.path.join(default_output_dir, f"{name}_pretty.txt")
+    # Streaming mode: no full-table console previews, pretty table only on request
+    if args.chunksize:
+        # Mean filling still needs the first pass; otherwise a cached schema
+        # replaces it, once the first rows show it still fits
+        stats = None
+        if entry is not None and args.fill_numbers != "mean":
+            stats = stats_from_schema(entry)
+            dtype = {col: str for col in stats["text_columns"]}
+            with read_csv_chunks(input_file, SCHEMA_CHECK_ROWS, dtype=dtype) as chunks:
+                sample = next(iter(chunks), None)
+            if sample is not None and not schema_matches(sample, entry["numeric"], args.numeric_threshold):
+                cache.discard(key)
+                stats = None
+        if stats is None:
+            with profiler.stage("collect_stats") as stage:
+                stats = (empty_stats() if input_file == STDIO
+                         else collect_stats(input_file, args.chunksize, args.numeric_threshold,
+                                            args.fill_numbers, args.fill_strings,
+                                            memory_budget=args.dedup_memory * 1024 * 1024,
+                                            bits=args.dedup_bits, spill_dir=args.spill_dir))
+                stage["bytes_read"] += file_size(input_file)
+            if cache is not None:
+                cache.put(key, schema_from_stats(stats, source))
+        pipeline = chunk_pipeline(stats, dedup, args.fill_strings, args.fill_numbers,
+                                  track_memory=args.stage_report, compact=args.compact_strings,
+                                  category_threshold=args.category_threshold)
+        if args.preview:
+            print(f"Cleaned CSV (first chunk of {input_file}):\n", file=console)
+            pretty_print(stream_clean(input_file, None, args.chunksize, args.fill_strings, args.fill_numbers,
+                                      preview=True, dedup=dedup, stats=stats, pipeline=pipeline,
+                                      threshold=args.numeric_threshold),
+                         args.preview_rows, console)
+            return
+        with profiler.stage("stream_clean") as stage:
+            rows = stream_clean(input_file, output_file, args.chunksize, args.fill_strings,
+                                args.fill_numbers, dedup=dedup, fmt=args.format,
+                                row_group_size=args.row_group_size, stats=stats, pipeline=pipeline,
+                                threshold=args.numeric_threshold)
+            stage["rows"] += rows
+            stage["bytes_read"] += file_size(input_file)
+            stage["bytes_written"] += file_size(output_file)
+        add_pipeline_report(profiler, pipeline)
+        print(f"Cleaned {args.format.upper()} saved to: {output_file} ({rows} rows)", file=console)
+        if args.stage_report:
+            print("\nStage report:\n", file=console)
+            print(pipeline.format_report(), file=console)
+        if pretty_out:
+            with profiler.stage("save_pretty") as stage:
+                save_pretty_chunked(output_file, pretty_out, args.chunksize, args.format)
+                stage["rows"] += rows
+                stage["bytes_written"] += file_size(pretty_out)
+            print(f"Pretty table saved to: {pretty_out}", file=console)
+        return
+
+    if not pretty_out:
+        pretty_out = default_pretty
 
     # -----------------------
     # Read and clean
     # -----------------------
-    df = read_csv(args.input_file)
-    print("Original CSV:\n")
-    pretty_print(df)
+    df = None
+    with profiler.stage("read_csv") as stage:
+        if entry is not None:
+            try:
+                df = read_csv(input_file, args.engine, dtype=entry["dtype"])
+            except (ValueError, TypeError):
+                # The feed changed (e.g. text in a cached int column): infer again
+                df = None
+            if df is not None and not schema_matches(df, entry["numeric"], args.numeric_threshold):
+                df = None  # a cached numeric column holds text now
+            if df is None:
+                cache.discard(key)
+                entry = None
+        if df is None:
+            df = read_csv(input_file, args.engine)
+        stage["rows"] += len(df)
+        stage["bytes_read"] += file_size(input_file)
+    raw_columns, raw_dtypes = list(df.columns), list(df.dtypes)
+    print("Original CSV:\n", file=console)
+    pretty_print(df, args.preview_rows, console)
 
-    df = normalize_column_names(df)
-    df = auto_detect_numeric(df)
-    df = fill_strings(df, args.fill_strings)
-    df = remove_duplicates(df)
-    if args.fill_numbers != "none":
-        df = fill_numbers(df, args.fill_numbers)
+    pipeline = CleaningPipeline(args.fill_strings, args.fill_numbers, dedup,
+                                numeric_columns=entry["numeric"] if entry else None,
+                                threshold=args.numeric_threshold, sample_rows=args.sample_rows,
+                                track_memory=args.stage_report, compact=args.compact_strings,
+                                category_threshold=args.category_threshold)
+    df = pipeline.run(df)
+    add_pipeline_report(profiler, pipeline)
+    if cache is not None and entry is None:
+        cache.put(key, schema_from_dataframe(raw_columns, raw_dtypes, df, source))
 
-    print("\nCleaned CSV:\n")
-    pretty_print(df)
+    print("\nCleaned CSV:\n", file=console)
+    pretty_print(df, args.preview_rows, console)
 
     # -----------------------
     # Save outputs
     # -----------------------
-    save_pretty(df, args.pretty_out)
-    print(f"\nPretty table saved to: {args.pretty_out}")
+    if args.stage_report:
+        print("\nStage report:\n", file=console)
+        print(pipeline.format_report(), file=console)
+
+    if pretty_out:
+        with profiler.stage("save_pretty") as stage:
+            save_pretty(df, pretty_out)
+            stage["rows"] += len(df)
+            stage["bytes_written"] += file_size(pretty_out)
+        print(f"\nPretty table saved to: {pretty_out}", file=console)
     if not args.preview:
-        save_csv(df, args.output_file)
-        print(f"\nCleaned CSV saved to: {args.output_file}")
+        with profiler.stage("save_output") as stage:
+            save_output(df, output_file, args.format, args.row_group_size)
+            stage["rows"] += len(df)
+            stage["bytes_written"] += file_size(output_file)
+        print(f"\nCleaned {args.format.upper()} saved to: {output_file}", file=console)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pro-level Generic CSV Cleaner")
+    parser.add_argument("--in", dest="input_files", nargs="+", required=True,
+                        help="Input CSV file path(s), optionally .gz/.bz2/.xz/.zst, or - for stdin; "
+                             "duplicates are removed across all of them")
+    parser.add_argument("--out", dest="output_file", help="Output CSV file path (.gz/.bz2/.xz/.zst compresses it), or - for stdout")
+    parser.add_argument("--fill-strings", default="Unknown", help="Fill missing string values with this")
+    parser.add_argument("--fill-numbers", choices=["mean", "zero", "none"], default="mean", help="How to fill missing numeric values")
+    parser.add_argument("--preview", action="store_true", help="Preview only; do not save")
+    parser.add_argument("--pretty-out", help="Save a pretty ASCII table to a file")
+    parser.add_argument("--preview-rows", type=int, help="Only show the first and last N rows in console previews")
+    parser.add_argument("--chunksize", type=int, help="Stream the file in chunks of this many rows (bounded memory)")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format for the cleaned data")
+    parser.add_argument("--engine", choices=["c", "python", "pyarrow"], help="CSV reader engine (pyarrow reads with multiple threads)")
+    parser.add_argument("--row-group-size", type=int, help="Rows per Parquet row group / Feather record batch")
+    parser.add_argument("--numeric-threshold", type=float, default=NUMERIC_THRESHOLD, help="Share of values that must be numbers to treat a text column as numeric")
+    parser.add_argument("--sample-rows", type=int, help="Infer numeric columns from a sample of this many rows")
+    parser.add_argument("--schema-cache", help="JSON file caching inferred schemas per source and header")
+    parser.add_argument("--source", help="Source name for the schema cache (default: input file name)")
+    parser.add_argument("--stage-report", action="store_true", help="Print wall time and allocated bytes per cleaning stage")
+    parser.add_argument("--compact-strings", action="store_true", help="Store text columns as category / string[pyarrow] instead of Python objects")
+    parser.add_argument("--category-threshold", type=int, default=CATEGORY_THRESHOLD, help="Max distinct values for a text column to become category")
+    parser.add_argument("--dedup-memory", type=int, default=256, help="Memory budget in MB for duplicate fingerprints before spilling to disk")
+    parser.add_argument("--dedup-bits", type=int, choices=[64, 128], default=64, help="Row fingerprint size for duplicate removal")
+    parser.add_argument("--spill-dir", help="Folder for spilled duplicate fingerprints (default: system temp)")
+    parser.add_argument("--incremental", action="store_true", help="Only clean rows appended since the last run and append them to the output")
+    parser.add_argument("--checkpoint", help="Checkpoint file for --incremental (default: <output>.checkpoint.json)")
+    parser.add_argument("--profile", help="Write a JSON report of per-stage time, rows/s, bytes and peak RSS here (- for stderr)")
+    parser.add_argument("--profile-dump", help="Also write a cProfile dump (.prof), or a pyinstrument report (.html)")
+    args = parser.parse_args()
+
+    if args.chunksize is not None and args.chunksize < 1:
+        parser.error("--chunksize must be a positive number of rows")
+    if args.engine == "pyarrow" and args.chunksize:
+        parser.error("--engine pyarrow reads whole files and cannot be combined with --chunksize")
+    if args.row_group_size is not None and args.row_group_size < 1:
+        parser.error("--row-group-size must be a positive number of rows")
+    if not 0 < args.numeric_threshold <= 1:
+        parser.error("--numeric-threshold must be between 0 and 1")
+    if args.sample_rows is not None and args.sample_rows < 1:
+        parser.error("--sample-rows must be a positive number of rows")
+    if args.preview_rows is not None and args.preview_rows < 0:
+        parser.error("--preview-rows must not be negative")
+    if len(args.input_files) > 1 and (args.output_file or args.pretty_out):
+        parser.error("--out and --pretty-out can only be used with a single input file")
+    reads_stdin = STDIO in args.input_files
+    writes_stdout = args.output_file == STDIO or (args.input_files == [STDIO] and not args.output_file)
+    if reads_stdin and len(args.input_files) > 1:
+        parser.error("standard input (-) cannot be combined with other input files")
+    if reads_stdin and args.schema_cache:
+        parser.error("--schema-cache needs a header it can read separately and does not work with stdin")
+    if writes_stdout and args.format != "csv":
+        parser.error("only CSV output can be written to stdout")
+    if writes_stdout and args.chunksize and args.pretty_out:
+        parser.error("--pretty-out re-reads the cleaned file and needs --out to be a file with --chunksize")
+    if args.incremental and (reads_stdin or writes_stdout or any(split_compression(f)[1] for f in args.input_files)):
+        parser.error("--incremental needs an uncompressed input file and an output file")
+    if args.incremental and (args.format != "csv" or args.preview or args.schema_cache):
+        parser.error("--incremental appends CSV output and cannot be combined with --format, --preview or --schema-cache")
+    if args.checkpoint and (not args.incremental or len(args.input_files) > 1):
+        parser.error("--checkpoint needs --incremental and a single input file")
+
+    # Report a bad path before any data library is imported
+    for input_file in args.input_files:
+        if input_file != STDIO and not os.path.isfile(input_file):
+            raise FileNotFoundError(f"Input file '{input_file}' does not exist!")
+
+    cache = SchemaCache(args.schema_cache) if args.schema_cache else None
+    profiler = Profiler("csv-cleaner")
+    if args.profile_dump:
+        profiler.start_dump(args.profile_dump)
+
+    # A single in-memory file keeps plain drop_duplicates; anything else shares one engine.
+    # Incremental runs keep a persisted engine per file in its checkpoint.
+    if args.incremental or (len(args.input_files) == 1 and not args.chunksize):
+        for input_file in args.input_files:
+            clean_file(input_file, args, cache=cache, profiler=profiler)
+    else:
+        with row_deduplicator(args.dedup_memory * 1024 * 1024, args.dedup_bits,
+                              spill_dir=args.spill_dir) as dedup:
+            for input_file in args.input_files:
+                clean_file(input_file, args, dedup, cache, profiler)
+            print(f"\nDuplicates removed: {dedup.duplicates} of {dedup.rows_seen} rows "
+                  f"({dedup.spilled_partitions} partitions spilled to disk)",
+                  file=sys.stderr if writes_stdout else sys.stdout)
+
+    if cache is not None:
+        cache.save()
+    if args.profile:
+        profiler.write(args.profile)
+    profiler.stop_dump()
 
 # -----------------------
 # Entry point
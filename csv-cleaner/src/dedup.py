@@ -0,0 +1,319 @@
+"""
+Bounded-memory duplicate row removal for csv-cleaner.
+
+Rows are reduced to 64- or 128-bit fingerprints and kept in hash partitions.
+Each partition holds a sorted NumPy array (8 or 16 bytes per row) plus a small
+set of recent fingerprints. When the total size goes over the memory budget,
+the largest partitions are spilled to sorted .npy runs and searched through
+memory maps, so lookups only touch the pages they need. Later fingerprints
+of a spilled partition are appended as new runs and merged in a streaming
+pass, so the partition is never read back into RAM.
+
+The same RowDeduplicator can be fed chunks from several files, which removes
+duplicates across the whole input.
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# hash_pandas_object needs a 16-byte key; a second key gives the low 64 bits
+SECOND_HASH_KEY = "csv-cleaner-dd16"
+
+# Rough cost of one fingerprint in a Python set (object + hash table slot)
+PENDING_ENTRY_BYTES = 100
+
+# Values per run read at a time when spilled runs are merged
+MERGE_BLOCK = 256 * 1024
+
+
+def row_fingerprints(df, bits=64):
+    """Return (fingerprints, partition_keys) for every row of df.
+
+    Numeric columns are hashed as float64 so 1 and 1.0 match across chunks
+    whose dtypes differ. 64-bit fingerprints are uint64; 128-bit ones are
+    16-byte strings (S16) so they still sort and compare in NumPy.
+    """
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    df = df.astype({col: "float64" for col in numeric_cols})
+    high = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    if bits == 64:
+        return high, high
+    low = pd.util.hash_pandas_object(df, index=False, hash_key=SECOND_HASH_KEY).to_numpy()
+    packed = np.stack([high, low], axis=1).astype(">u8").view("S16").ravel()
+    return packed, high
+
+
+def _isin_sorted(sorted_values, values):
+    if len(sorted_values) == 0 or len(values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.searchsorted(sorted_values, values)
+    pos[pos == len(sorted_values)] = 0
+    return np.asarray(sorted_values[pos] == values)
+
+
+def merge_runs(runs, path, block=MERGE_BLOCK):
+    """Streaming k-way merge of sorted arrays (usually memory maps) into a
+    new .npy file at path. At most `block` values per run are in RAM at once.
+
+    Each step reads the next block of every run and writes out everything up
+    to the smallest of the blocks' last values, which is known to come before
+    whatever the runs still hold.
+    """
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=runs[0].dtype, shape=(sum(len(r) for r in runs),))
+    positions = [0] * len(runs)
+    written = 0
+    while True:
+        live = [(i, run[positions[i]:positions[i] + block]) for i, run in enumerate(runs)
+                if positions[i] < len(run)]
+        if not live:
+            break
+        cut = min(part[-1] for _, part in live)
+        taken = []
+        for i, part in live:
+            count = int(np.searchsorted(part, cut, side="right"))
+            taken.append(part[:count])
+            positions[i] += count
+        merged = np.sort(np.concatenate(taken))
+        out[written:written + len(merged)] = merged
+        written += len(merged)
+    out.flush()
+    del out
+
+
+class _Partition:
+    """Fingerprints of one hash partition.
+
+    In memory: a sorted array plus a set of recent fingerprints. spill()
+    writes the sorted array as a new run file instead of rewriting what is
+    already on disk, and runs of similar size are merged (merge_runs), so a
+    partition of N fingerprints has O(log N) runs and each fingerprint is
+    rewritten O(log N) times.
+    """
+
+    def __init__(self, dtype, path):
+        self.dtype = dtype
+        self.path = path  # run files are named path_<n>.npy
+        self.sorted = np.empty(0, dtype=dtype)
+        self.pending = set()
+        self.runs = []  # memory-mapped sorted runs on disk, largest first, once spilled
+        self._run_paths = []
+        self._next_run = 0
+
+    @property
+    def spilled(self):
+        return bool(self.runs)
+
+    @property
+    def memory_bytes(self):
+        return self.sorted.nbytes + len(self.pending) * PENDING_ENTRY_BYTES
+
+    def contains(self, values):
+        found = _isin_sorted(self.sorted, values)
+        for run in self.runs:
+            found |= _isin_sorted(run, values)
+        if self.pending:
+            pending = self.pending
+            found |= np.fromiter((v in pending for v in values.tolist()), dtype=bool, count=len(values))
+        return found
+
+    def add(self, values, pending_limit):
+        self.pending.update(values.tolist())
+        if len(self.pending) >= pending_limit:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        fresh = np.array(list(self.pending), dtype=self.dtype)
+        self.pending = set()
+        self.merge(fresh)
+
+    def merge(self, values):
+        """Add fingerprints known to be new without a membership check."""
+        self.flush()
+        self.sorted = np.sort(np.concatenate([self.sorted, values]))
+
+    def values(self):
+        """All fingerprints of this partition as one sorted array (a memory
+        map once spilled; its runs are merged into one first)."""
+        if not self.runs:
+            self.flush()
+            return self.sorted
+        self.spill()
+        if len(self.runs) > 1:
+            self._merge(len(self.runs))
+        return self.runs[0]
+
+    def spill(self):
+        """Move this partition's in-memory fingerprints to disk as a new run."""
+        self.flush()
+        if len(self.sorted):
+            self._append_run(self.sorted)
+        self.sorted = np.empty(0, dtype=self.dtype)
+
+    def _new_path(self):
+        self._next_run += 1
+        return f"{self.path[:-len('.npy')]}_{self._next_run:06d}.npy"
+
+    def _append_run(self, values):
+        path = self._new_path()
+        np.save(path, values)
+        self.runs.append(np.load(path, mmap_mode="r"))
+        self._run_paths.append(path)
+        # Keep run sizes shrinking geometrically: merge the newest runs while
+        # the one before them is not at least twice their size
+        count = 1
+        while count < len(self.runs) and len(self.runs[-count - 1]) < 2 * sum(
+                len(run) for run in self.runs[-count:]):
+            count += 1
+        if count > 1:
+            self._merge(count)
+
+    def _merge(self, count):
+        """Merge the newest count runs into one."""
+        path = self._new_path()
+        merge_runs(self.runs[-count:], path)
+        old = self._run_paths[-count:]
+        del self.runs[-count:], self._run_paths[-count:]  # release the mappings before deleting
+        for old_path in old:
+            os.remove(old_path)
+        self.runs.append(np.load(path, mmap_mode="r"))
+        self._run_paths.append(path)
+
+    def close(self):
+        self.runs = []
+        for path in self._run_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._run_paths = []
+
+
+class RowDeduplicator:
+    """Remove rows already seen in earlier chunks or files.
+
+    memory_budget: bytes of fingerprint data kept in RAM before spilling.
+    bits: 64 or 128-bit fingerprints (128 makes collisions practically impossible).
+    partitions: number of hash partitions (rounded up to a power of two).
+    spill_dir: folder for spilled partitions; a temp folder is used by default.
+    """
+
+    def __init__(self, memory_budget=256 * 1024 * 1024, bits=64, partitions=64,
+                 spill_dir=None, pending_limit=65536):
+        if bits not in (64, 128):
+            raise ValueError("bits must be 64 or 128")
+        self.memory_budget = memory_budget
+        self.bits = bits
+        self.pending_limit = pending_limit
+        self._shift = np.uint64(64 - max(1, int(partitions - 1).bit_length()))
+        count = 1 << (64 - int(self._shift))
+
+        self._own_dir = spill_dir is None
+        self.spill_dir = tempfile.mkdtemp(prefix="csvcleaner-dedup-") if spill_dir is None else spill_dir
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        dtype = np.uint64 if bits == 64 else np.dtype("S16")
+        self._partitions = [
+            _Partition(dtype, os.path.join(self.spill_dir, f"part_{i:04d}.npy")) for i in range(count)
+        ]
+        self.rows_seen = 0
+        self.duplicates = 0
+
+    @property
+    def memory_bytes(self):
+        return sum(p.memory_bytes for p in self._partitions)
+
+    @property
+    def spilled_partitions(self):
+        return sum(p.spilled for p in self._partitions)
+
+    def new_rows_mask(self, df):
+        """Boolean mask of rows in df that have not been seen before.
+        The first occurrence of a row inside df counts as new."""
+        fingerprints, keys = row_fingerprints(df, self.bits)
+        mask = np.zeros(len(df), dtype=bool)
+        if len(df) == 0:
+            return mask
+
+        _, first = np.unique(fingerprints, return_index=True)
+        parts = (keys[first] >> self._shift).astype(np.intp)
+        for part_id in np.unique(parts):
+            rows = first[parts == part_id]
+            partition = self._partitions[part_id]
+            new = rows[~partition.contains(fingerprints[rows])]
+            partition.add(fingerprints[new], self.pending_limit)
+            mask[new] = True
+
+        self.rows_seen += len(df)
+        self.duplicates += len(df) - int(mask.sum())
+        self._enforce_budget()
+        return mask
+
+    def filter(self, df):
+        return df[self.new_rows_mask(df)]
+
+    def _partition_ids(self, fingerprints):
+        if self.bits == 64:
+            keys = fingerprints
+        else:
+            # The high 8 bytes of a packed 128-bit fingerprint are the partition key
+            keys = np.frombuffer(fingerprints.tobytes(), dtype=">u8")[::2].astype(np.uint64)
+        return (keys >> self._shift).astype(np.intp)
+
+    def save(self, path):
+        """Write every fingerprint to one .npy file, partition by partition,
+        so a later run can load() them and keep removing the same rows."""
+        total = sum(len(p.values()) for p in self._partitions)
+        out = np.lib.format.open_memmap(path + ".tmp.npy", mode="w+",
+                                        dtype=self._partitions[0].dtype, shape=(total,))
+        start = 0
+        for partition in self._partitions:
+            values = partition.values()
+            out[start:start + len(values)] = values
+            start += len(values)
+        out.flush()
+        del out
+        os.replace(path + ".tmp.npy", path)
+
+    def load(self, path, block=1024 * 1024):
+        """Add fingerprints written by save(), spilling as the budget requires."""
+        stored = np.load(path, mmap_mode="r")
+        if stored.dtype != self._partitions[0].dtype:
+            raise ValueError(f"'{path}' holds {stored.dtype} fingerprints, expected {self.bits}-bit")
+        for start in range(0, len(stored), block):
+            values = np.asarray(stored[start:start + block])
+            parts = self._partition_ids(values)
+            for part_id in np.unique(parts):
+                self._partitions[part_id].merge(values[parts == part_id])
+            self._enforce_budget()
+
+    def _enforce_budget(self):
+        if self.memory_bytes <= self.memory_budget:
+            return
+        # Sorted arrays take 8-16 bytes per fingerprint against ~100 in a set,
+        # so compacting the pending sets often frees enough on its own
+        for partition in self._partitions:
+            partition.flush()
+        # Spill down to half the budget, so runs are written in large pieces
+        # rather than one small run per chunk
+        while self.memory_bytes > self.memory_budget // 2:
+            largest = max(self._partitions, key=lambda p: p.memory_bytes)
+            if largest.memory_bytes == 0:
+                break
+            largest.spill()
+
+    def close(self):
+        for partition in self._partitions:
+            partition.close()
+        if self._own_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,221 @@
+"""
+Output formats for csv-cleaner: CSV, Parquet and Feather.
+
+Parquet and Feather keep the dtypes produced by auto_detect_numeric and
+fill_numbers, so downstream jobs can load the cleaned data without parsing
+text again. Both need pyarrow, which is an optional dependency and is only
+imported when one of these formats (or the pyarrow reader) is used.
+
+CSV input and output can be gzip, bz2, xz or zstd compressed and are
+(de)compressed while streaming, never through a temporary file. "-" stands
+for standard input / output.
+"""
+import os
+import sys
+
+FORMATS = ("csv", "parquet", "feather")
+EXTENSIONS = {"parquet": ".parquet", "feather": ".feather"}
+
+STDIO = "-"
+COMPRESSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".zst": "zstd"}
+MAGIC_NUMBERS = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz"), (b"\x28\xb5\x2f\xfd", "zstd"))
+
+
+def require_pyarrow(feature):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise RuntimeError(f"{feature} requires pyarrow: pip install pyarrow") from None
+
+
+def require_zstandard(feature):
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        raise RuntimeError(f"{feature} requires zstandard: pip install zstandard") from None
+
+
+def split_compression(path):
+    """Return (path without its compression suffix, compression name or None),
+    e.g. feed.csv.gz -> (feed.csv, "gzip")."""
+    base, ext = os.path.splitext(path)
+    compression = COMPRESSIONS.get(ext.lower())
+    return (base, compression) if compression else (path, None)
+
+
+def open_compressed(target, compression, mode):
+    """Open a path or binary file object through a (de)compressor.
+    Text modes ("rt", "wt", "at") get UTF-8 and untranslated newlines."""
+    text = {"encoding": "utf-8", "newline": ""} if "t" in mode else {}
+    if compression == "gzip":
+        import gzip
+        return gzip.open(target, mode, **text)
+    if compression == "bz2":
+        import bz2
+        return bz2.open(target, mode, **text)
+    if compression == "xz":
+        import lzma
+        return lzma.open(target, mode, **text)
+    if compression == "zstd":
+        require_zstandard("zstd compression")
+        import zstandard
+        return zstandard.open(target, mode, **text)
+    raise ValueError(f"Unknown compression '{compression}'")
+
+
+def open_input(path):
+    """Open a CSV source as a binary stream for pandas.
+
+    Compression is detected from the first bytes rather than the name, so
+    compressed data piped into standard input (path "-") works too.
+    """
+    raw = sys.stdin.buffer if path == STDIO else open(path, "rb")
+    head = raw.peek(6)[:6]
+    for magic, compression in MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return open_compressed(raw, compression, "rb")
+    return raw
+
+
+def open_output(path, append=False):
+    """Open a CSV destination as a text stream, compressed according to its
+    extension. Path "-" is standard output, which callers must not close."""
+    if path == STDIO:
+        return sys.stdout
+    mode = "at" if append else "wt"
+    compression = split_compression(path)[1]
+    if compression:
+        return open_compressed(path, compression, mode)
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def output_extension(fmt, input_ext=".csv"):
+    """Extension for cleaned output: the input's own for CSV, else the format's."""
+    return EXTENSIONS.get(fmt, input_ext)
+
+
+def save_output(df, output_path, fmt="csv", row_group_size=None):
+    """Write a whole DataFrame in the requested format."""
+    if fmt == "csv":
+        with ChunkWriter(output_path) as writer:
+            writer.write(df)
+        return
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if fmt == "parquet":
+        require_pyarrow("Parquet output")
+        df.to_parquet(output_path, index=False, engine="pyarrow", row_group_size=row_group_size)
+    elif fmt == "feather":
+        require_pyarrow("Feather output")
+        df.reset_index(drop=True).to_feather(output_path)
+    else:
+        raise ValueError(f"Unknown output format '{fmt}' (expected one of {', '.join(FORMATS)})")
+
+
+class ChunkWriter:
+    """Append cleaned chunks to one output file.
+
+    CSV chunks are written as text through one open (and possibly
+    compressed) stream, so a compressor sees the whole output; Parquet chunks become row groups of at
+    most row_group_size rows; Feather chunks become record batches of one
+    Arrow IPC file. The Arrow schema is fixed by the first chunk, and later
+    chunks are cast to it so dtype drift between chunks cannot break the file.
+    With append=True, CSV chunks go after the existing rows without a header.
+    """
+
+    def __init__(self, output_path, fmt="csv", row_group_size=None, append=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}' (expected one of {', '.join(FORMATS)})")
+        if append and fmt != "csv":
+            raise ValueError(f"Appending to an existing file is only supported for CSV, not {fmt}")
+        if fmt != "csv":
+            require_pyarrow(f"{fmt.capitalize()} output")
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        self.output_path = output_path
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._started = append
+        self._handle = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        if self.fmt == "csv":
+            if self._handle is None:
+                self._handle = open_output(self.output_path, append=self._started)
+            df.to_csv(self._handle, header=not self._started, index=False)
+        else:
+            self._write_arrow(df)
+        self._started = True
+        self.rows += len(df)
+
+    def _write_arrow(self, df):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._schema = self._stable_schema(table.schema)
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self.output_path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self.output_path, self._schema)
+        table = table.cast(self._schema)
+
+        if self.fmt == "parquet":
+            self._writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table, max_chunksize=self.row_group_size)
+
+    def _stable_schema(self, schema):
+        """Schema that every chunk can be cast to. Category columns have a
+        different dictionary (and index width) per chunk: Parquet stores a
+        dictionary per row group, so only the index type is widened; an Arrow
+        IPC file allows a single dictionary, so Feather stores plain values."""
+        import pyarrow as pa
+
+        fields = []
+        for field in schema:
+            if pa.types.is_dictionary(field.type):
+                value_type = field.type.value_type
+                field = field.with_type(
+                    pa.dictionary(pa.int32(), value_type) if self.fmt == "parquet" else value_type
+                )
+            fields.append(field)
+        return pa.schema(fields, metadata=schema.metadata)
+
+    def close(self):
+        if self._handle is not None:
+            if self._handle is sys.stdout:
+                self._handle.flush()
+            else:
+                self._handle.close()
+            self._handle = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_output_chunks(path, fmt, chunksize):
+    """Yield DataFrames of at most chunksize rows from a cleaned output file."""
+    if fmt == "csv":
+        import pandas as pd
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)
+    elif fmt == "parquet":
+        require_pyarrow("Parquet input")
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        require_pyarrow("Feather input")
+        import pyarrow as pa
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
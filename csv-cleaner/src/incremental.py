@@ -0,0 +1,200 @@
+"""
+Incremental append mode for csv-cleaner.
+
+Feeds that only grow at the end (logs, daily exports) do not need to be
+cleaned from scratch on every run. A checkpoint next to the output records
+how many bytes of the input were cleaned, the mergeable column counts from
+count_chunks() and the duplicate fingerprints, so the next run reads only
+the new tail and appends its cleaned rows to the existing output.
+
+The output is rebuilt from scratch when there is no usable checkpoint, the
+cleaning options changed, the input was truncated or rewritten (its size
+dropped below the offset, or the bytes at its head or just before the offset
+changed), or the new rows flip the numeric decision for a column. Mean
+filling uses running means: rows appended later are filled with the mean of
+everything seen so far, while rows already written keep the value they got.
+"""
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+try:
+    from .cleaner import CATEGORY_THRESHOLD, NUMERIC_THRESHOLD, chunk_pipeline, count_chunks, stats_from_counts
+    from .dedup import RowDeduplicator
+    from .formats import ChunkWriter
+except ImportError:  # run as a script or with src/ on sys.path
+    from cleaner import CATEGORY_THRESHOLD, NUMERIC_THRESHOLD, chunk_pipeline, count_chunks, stats_from_counts
+    from dedup import RowDeduplicator
+    from formats import ChunkWriter
+
+CHECKPOINT_VERSION = 1
+INCREMENTAL_CHUNKSIZE = 100_000
+
+# Bytes hashed at the start of the input and just before the offset to notice rewrites
+HEAD_HASH_BYTES = 64 * 1024
+EDGE_HASH_BYTES = 4 * 1024
+
+
+def checkpoint_paths(output_path, checkpoint_path=None):
+    """Return (checkpoint_json, fingerprints_npy) for an output file."""
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint.json"
+    return checkpoint_path, os.path.splitext(checkpoint_path)[0] + ".fingerprints.npy"
+
+
+def complete_end(file_path, block=64 * 1024):
+    """Offset just past the last newline. A line that is still being written
+    is left for the next run."""
+    with open(file_path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            pos = start
+    return 0
+
+
+def hash_range(file_path, start, end):
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(max(0, end - start))).hexdigest()
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of bytes [start, end) of an open binary file."""
+
+    def __init__(self, f, start, end):
+        f.seek(start)
+        self._f = f
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._f.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+
+def read_range_chunks(file_path, start, end, chunksize, columns=None, dtype=None):
+    """Yield raw chunks parsed from bytes [start, end) of a CSV. A range that
+    starts after the header gets its column names from `columns`."""
+    if end <= start:
+        return
+    header = {} if columns is None else {"header": None, "names": columns}
+    with open(file_path, "rb") as f:
+        text = io.TextIOWrapper(io.BufferedReader(_ByteRange(f, start, end)), encoding="utf-8", newline="")
+        yield from pd.read_csv(text, chunksize=chunksize, dtype=dtype, **header)
+
+
+def load_checkpoint(checkpoint_path):
+    if not os.path.isfile(checkpoint_path):
+        return None
+    with open(checkpoint_path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+    tmp_path = checkpoint_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def rebuild_reason(checkpoint, input_path, output_path, fingerprints_path, settings, end):
+    """Why the checkpoint cannot be extended, or None when the tail can be appended."""
+    if checkpoint is None:
+        return "no checkpoint"
+    if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("settings") != settings:
+        return "cleaning options changed"
+    offset = checkpoint["offset"]
+    if end < offset:
+        return "input was truncated"
+    if (hash_range(input_path, 0, checkpoint["head_bytes"]) != checkpoint["head_hash"]
+            or hash_range(input_path, offset - checkpoint["edge_bytes"], offset) != checkpoint["edge_hash"]):
+        return "input was rewritten"
+    if not os.path.isfile(output_path) or os.path.getsize(output_path) < checkpoint["output_bytes"]:
+        return "output is missing or shorter than recorded"
+    if not os.path.isfile(fingerprints_path):
+        return "duplicate fingerprints are missing"
+    return None
+
+
+def incremental_clean(input_path, output_path, chunksize=INCREMENTAL_CHUNKSIZE, fill_value="Unknown",
+                      fill_method="mean", checkpoint_path=None, threshold=NUMERIC_THRESHOLD,
+                      dedup_memory=256 * 1024 * 1024, dedup_bits=64, spill_dir=None,
+                      compact=False, category_threshold=CATEGORY_THRESHOLD):
+    """Clean only the part of input_path added since the last run and append
+    it to the CSV at output_path.
+
+    Returns (rows, reason): the number of rows written by this run, and None
+    for an append or the reason the output had to be rebuilt in full.
+    """
+    if not os.path.isfile(input_path):
+        raise FileNotFoundError(f"Input file '{input_path}' does not exist!")
+    checkpoint_path, fingerprints_path = checkpoint_paths(output_path, checkpoint_path)
+    settings = {"fill_value": fill_value, "fill_method": fill_method,
+                "threshold": threshold, "dedup_bits": dedup_bits}
+    end = complete_end(input_path)
+    checkpoint = load_checkpoint(checkpoint_path)
+    reason = rebuild_reason(checkpoint, input_path, output_path, fingerprints_path, settings, end)
+
+    if reason is None:
+        if end == checkpoint["offset"]:
+            return 0, None
+        offset, columns = checkpoint["offset"], checkpoint["counts"]["columns"]
+        counts = count_chunks(read_range_chunks(input_path, offset, end, chunksize, columns),
+                              checkpoint["counts"])
+        stats = stats_from_counts(counts, threshold)
+        if stats["numeric"] != checkpoint["numeric"]:
+            reason = "new rows changed the numeric columns"
+
+    if reason is not None:
+        offset, columns = 0, None
+        counts = count_chunks(read_range_chunks(input_path, 0, end, chunksize))
+        stats = stats_from_counts(counts, threshold)
+
+    with RowDeduplicator(dedup_memory, dedup_bits, spill_dir=spill_dir) as dedup:
+        if reason is None:
+            dedup.load(fingerprints_path)
+            # Drop rows a crashed run appended after the last checkpoint
+            os.truncate(output_path, checkpoint["output_bytes"])
+
+        pipeline = chunk_pipeline(stats, dedup, fill_value, fill_method,
+                                  compact=compact, category_threshold=category_threshold)
+        dtype = {col: str for col in stats["text_columns"]}
+        append = reason is None and checkpoint["output_bytes"] > 0
+        with ChunkWriter(output_path, "csv", append=append) as writer:
+            for chunk in read_range_chunks(input_path, offset, end, chunksize, columns, dtype):
+                writer.write(pipeline.run(chunk))
+        if not os.path.exists(output_path):
+            open(output_path, "w").close()
+
+        dedup.save(fingerprints_path)
+
+    head_bytes = min(end, HEAD_HASH_BYTES)
+    edge_bytes = min(end, EDGE_HASH_BYTES)
+    save_checkpoint(checkpoint_path, {
+        "version": CHECKPOINT_VERSION,
+        "input": os.path.abspath(input_path),
+        "settings": settings,
+        "offset": end,
+        "head_bytes": head_bytes,
+        "head_hash": hash_range(input_path, 0, head_bytes),
+        "edge_bytes": edge_bytes,
+        "edge_hash": hash_range(input_path, end - edge_bytes, end),
+        "output_bytes": os.path.getsize(output_path),
+        "numeric": stats["numeric"],
+        "counts": counts,
+    })
+    return writer.rows, reason
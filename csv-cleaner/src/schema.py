@@ -0,0 +1,59 @@
+"""
+Persisted schema cache for csv-cleaner.
+
+Feeds that arrive with the same header every day do not need numeric type
+inference on every run. The cache maps a hash of (source name, header) to
+the columns that were detected as numeric and the dtypes to pass to the
+reader, stored as a small JSON file.
+"""
+import hashlib
+import json
+import os
+
+
+def schema_key(columns, source=""):
+    """Stable key for a header + source name."""
+    digest = hashlib.sha1()
+    digest.update(source.encode("utf-8"))
+    for col in columns:
+        digest.update(b"\x1f" + str(col).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_header(file_path):
+    """Return the raw header names without reading any data rows."""
+    import pandas as pd
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+
+class SchemaCache:
+    """JSON file of schema entries keyed by schema_key().
+
+    An entry is {"source", "columns", "numeric", "dtype"}: numeric lists the
+    normalized numeric column names, dtype maps raw header names to the dtype
+    the reader should use ("str" for text or numbers that still need
+    to_numeric, otherwise a NumPy dtype name).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.isfile(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
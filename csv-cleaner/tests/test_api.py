@@ -0,0 +1,33 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+# Add src folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "../src")
+sys.path.insert(0, src_dir)
+
+from api import Cleaner, clean, clean_csv
+
+def test_cleaner_reused_across_dataframes():
+    cleaner = Cleaner(fill_value="n/a", fill_method="zero")
+    raw = pd.DataFrame({" Name ": [" Ann", None, " Ann"], "Age": ["1", None, "1"]})
+    first = cleaner.clean(raw)
+    second = cleaner.clean(pd.DataFrame({" Name ": ["Bob", "Cid"], "Age": [None, "3"]}))
+    assert first.to_dict("list") == {"name": ["Ann", "n/a"], "age": [1, 0]}
+    assert second.to_dict("list") == {"name": ["Bob", "Cid"], "age": [0, 3]}
+    assert list(raw.columns) == [" Name ", "Age"]  # copy=True leaves the input alone
+    assert clean(raw, fill_method="zero")["age"].tolist() == [1, 0]
+
+def test_clean_csv_chunked_matches_whole_file(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("Name,Age\nAnn,1\nBob,x\nAnn,1\n,4\nCid,\n")
+    assert clean_csv(str(src), str(tmp_path / "whole.csv"), fill_method="zero") == 4
+    assert clean_csv(str(src), str(tmp_path / "chunked.csv"), chunksize=2, fill_method="zero") == 4
+    assert (tmp_path / "whole.csv").read_text() == (tmp_path / "chunked.csv").read_text()
+    assert clean_csv(str(src), str(tmp_path / "whole_mean.csv")) == 4
+    assert clean_csv(str(src), str(tmp_path / "chunked_mean.csv"), chunksize=2) == 4
+    assert (tmp_path / "whole_mean.csv").read_text() == (tmp_path / "chunked_mean.csv").read_text()
+    with pytest.raises(ValueError):
+        Cleaner(fill_method="median")
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Add src folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "../src")
+sys.path.insert(0, src_dir)
+
+from batch import find_inputs, run_batch
+
+def test_run_batch_writes_outputs_and_reports_failures(tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / "a.csv").write_text("Name,Age\nAnn,1\nAnn,1\n")
+    (input_dir / "b.csv").write_text("x\n\"unterminated\n")
+
+    files = find_inputs(str(input_dir))
+    results = {os.path.basename(r[0]): r for r in run_batch(files, workers=2)}
+
+    assert results["a.csv"][1] == 1 and results["a.csv"][3] is None
+    assert results["b.csv"][3] is not None
+    assert (tmp_path / "output" / "a_cleaned.csv").exists()
+    assert (tmp_path / "output" / "a_pretty.txt").exists()
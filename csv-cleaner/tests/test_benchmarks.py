@@ -0,0 +1,28 @@
+import os
+import sys
+import pandas as pd
+
+# Add benchmarks folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, "../benchmarks"))
+
+from bench_cleaner import compare_results, generate_csv
+
+def test_generate_csv_is_deterministic(tmp_path):
+    first = generate_csv(str(tmp_path / "a.csv"), 500, duplicate_rate=0.2, seed=7)
+    second = generate_csv(str(tmp_path / "b.csv"), 500, duplicate_rate=0.2, seed=7)
+    assert open(first).read() == open(second).read()
+    df = pd.read_csv(first)
+    assert len(df) == 500
+    assert df.duplicated().sum() > 0
+
+def test_compare_results_flags_regressions():
+    baseline = {"results": {"fill_strings": {"seconds": 1.0, "peak_bytes": 100}}}
+    slower = {"results": {"fill_strings": {"seconds": 1.5, "peak_bytes": 100}}}
+    assert compare_results(baseline, baseline) == []
+    assert len(compare_results(baseline, slower, time_tolerance=0.25)) == 1
+
+def test_startup_does_not_import_pandas():
+    from bench_cleaner import measure_startup
+    for name, result in measure_startup(repeat=1).items():
+        assert result["heavy_modules"] == [], name
@@ -1,6 +1,9 @@
 import os
 import sys
+import io
+import json
 import pandas as pd
+import pytest
 
 # Add src folder to Python path so imports work
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -12,8 +15,16 @@ from cleaner import (
     auto_detect_numeric,
     fill_strings,
     fill_numbers,
-    remove_duplicates
+    remove_duplicates,
+    stream_clean,
+    render_table,
+    numeric_ratio,
+    default_output_paths,
+    schema_from_dataframe,
+    main,
+    CleaningPipeline
 )
+from formats import open_input
 
 def test_normalize_column_names():
     df = pd.DataFrame({" Name ": [1], " Age ": [2]})
@@ -39,3 +50,117 @@ def test_remove_duplicates():
     df = pd.DataFrame({"x": [1,1,2]})
     df = remove_duplicates(df)
     assert len(df) == 2
+
+def test_stream_clean_matches_in_memory(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("Name,Age\nAnn,1\nBob,x\nAnn,1\n,4\nCid,\nDan,5\n")
+    out = tmp_path / "out.csv"
+    rows = stream_clean(str(src), str(out), chunksize=2, fill_method="zero")
+    assert rows == 5
+    df = pd.read_csv(out)
+    assert df["name"].tolist() == ["Ann", "Bob", "Unknown", "Cid", "Dan"]
+    assert df["age"].tolist() == [1, 0, 4, 0, 5]
+
+def test_stream_clean_mean_skips_duplicates(tmp_path):
+    src = tmp_path / "in.csv"
+    src.write_text("Name,Age\nx,10\nx,10\nx,10\ny,\nz,1\n")
+    in_memory = CleaningPipeline(fill_method="mean").run(pd.read_csv(src))
+    out = tmp_path / "out.csv"
+    assert stream_clean(str(src), str(out), chunksize=2, fill_method="mean") == 3
+    df = pd.read_csv(out)
+    assert df.to_dict("list") == in_memory.reset_index(drop=True).to_dict("list")
+    assert df["age"].tolist() == [10, 6, 1]  # mean of 10 and 1, not of 10, 10, 10 and 1
+
+@pytest.mark.parametrize("fill_method", ["mean", "zero"])
+def test_stream_clean_keeps_bool_columns(tmp_path, fill_method):
+    src = tmp_path / "in.csv"
+    src.write_text("id,flag,maybe,x\n1,True,True,10\n2,False,,\n3,True,False,5\n3,True,False,5\n")
+    in_memory = CleaningPipeline(fill_method=fill_method).run(pd.read_csv(src))
+    out = tmp_path / "out.csv"
+    assert stream_clean(str(src), str(out), chunksize=2, fill_method=fill_method) == 3
+    df = pd.read_csv(out, dtype=str)
+    assert df.to_dict("list") == in_memory.astype(str).reset_index(drop=True).to_dict("list")
+    assert df["flag"].tolist() == ["True", "False", "True"]
+    assert df["maybe"].tolist() == ["True", "Unknown", "False"]
+
+def test_render_table_head_tail():
+    df = pd.DataFrame({"n": range(6), "v": [1.0, 2.5, None, 4.0, 5.0, 6.0]})
+    out = io.StringIO()
+    render_table(df, out, head_rows=1)
+    assert out.getvalue().splitlines() == ["n  v  ", "------", "0  1  ", "...", "5  6  "]
+
+@pytest.mark.parametrize("fmt", ["parquet", "feather"])
+def test_stream_clean_columnar_keeps_dtypes(tmp_path, fmt):
+    pytest.importorskip("pyarrow")
+    src = tmp_path / "in.csv"
+    src.write_text("Name,Age\nAnn,1\nBob,\nCid,3\n")
+    out = tmp_path / f"out.{fmt}"
+    stream_clean(str(src), str(out), chunksize=1, fill_method="zero", fmt=fmt, row_group_size=1)
+    df = pd.read_parquet(out) if fmt == "parquet" else pd.read_feather(out)
+    assert df["age"].tolist() == [1, 0, 3]
+    assert pd.api.types.is_integer_dtype(df["age"])
+
+def test_auto_detect_numeric_threshold_and_sample():
+    df = pd.DataFrame({"mixed": ["1", "2", "3", "x"] * 500, "text": ["a"] * 2000})
+    ratio, converted = numeric_ratio(df["text"])
+    assert ratio == 0 and converted is None  # early exit after the first block
+    assert not pd.api.types.is_numeric_dtype(auto_detect_numeric(df.copy())["mixed"])
+    df = auto_detect_numeric(df, threshold=0.7, sample_rows=100)
+    assert pd.api.types.is_numeric_dtype(df["mixed"])
+    assert df["mixed"].isna().sum() == 500
+
+def test_cleaning_pipeline_report():
+    df = pd.DataFrame({" City ": [" Oslo", None, " Oslo"], "n": ["1", "2", "1"]})
+    pipeline = CleaningPipeline(fill_method="zero", track_memory=True)
+    df = pipeline.run(df)
+    assert df["city"].tolist() == ["Oslo", "Unknown"]
+    assert [name for name, _ in pipeline.stages][-1] == "fill_numbers"
+    assert pipeline.report["remove_duplicates"]["rows_out"] == 2
+    assert pipeline.report["fill_strings"]["calls"] == 1
+
+def test_fill_strings_compact():
+    df = pd.DataFrame({"city": [" Oslo", "Oslo", None], "id": ["a", "b", "c"]})
+    df = fill_strings(df, compact=True, category_threshold=3)
+    assert isinstance(df["city"].dtype, pd.CategoricalDtype)
+    assert df["city"].tolist() == ["Oslo", "Oslo", "Unknown"]
+    assert pd.api.types.is_string_dtype(df["id"]) and not pd.api.types.is_object_dtype(df["id"])
+    assert len(remove_duplicates(df)) == 3
+
+@pytest.mark.parametrize("ext", ["gz", "bz2", "xz"])
+def test_stream_clean_compressed(tmp_path, ext):
+    src = tmp_path / "input" / f"in.csv.{ext}"
+    src.parent.mkdir()
+    pd.DataFrame({"Name": ["Ann", "Ann", None], "Age": [1, 1, 3]}).to_csv(src, index=False)
+    out, pretty = default_output_paths(str(src))
+    assert out.endswith(f"in_cleaned.csv.{ext}") and pretty.endswith("in_pretty.txt")
+    assert stream_clean(str(src), out, chunksize=1) == 2
+    assert open_input(out).read() == b"name,age\nAnn,1\nUnknown,3\n"
+
+def test_stream_clean_stdin_single_pass(tmp_path, monkeypatch):
+    data = b"Name,Age\nAnn,2\nBob,\nCid,4\nDan,\n"
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BufferedReader(io.BytesIO(data))))
+    out = tmp_path / "out.csv"
+    assert stream_clean("-", str(out), chunksize=2) == 4
+    # Missing values get the mean of the rows read so far
+    assert pd.read_csv(out)["age"].tolist() == [2, 2, 4, 3]
+
+@pytest.mark.parametrize("extra", [[], ["--chunksize", "2", "--fill-numbers", "zero"]])
+def test_schema_cache_rechecks_drifted_columns(tmp_path, monkeypatch, extra):
+    src, out, cache = tmp_path / "feed.csv", tmp_path / "out.csv", tmp_path / "cache.json"
+    argv = ["cleaner.py", "--in", str(src), "--out", str(out), "--pretty-out", str(tmp_path / "pretty.txt"),
+            "--schema-cache", str(cache), *extra]
+    monkeypatch.setattr(sys, "argv", argv)
+    src.write_text("name,code\na,1\nb,2\nc,3\nd,4\ne,x\n")
+    main()
+    assert "code" in next(iter(json.loads(cache.read_text()).values()))["numeric"]
+
+    # Same header and dtypes, but the cached numeric column is text now
+    src.write_text("name,code\na,A1\nb,B2\nc,C3\nd,D4\ne,5\n")
+    main()
+    assert pd.read_csv(out)["code"].tolist() == ["A1", "B2", "C3", "D4", "5"]
+    assert next(iter(json.loads(cache.read_text()).values()))["numeric"] == []
+
+def test_schema_from_dataframe_skips_bool_columns():
+    df = pd.DataFrame({"flag": [True, False], "n": [1, 2]})
+    entry = schema_from_dataframe(["flag", "n"], list(df.dtypes), df)
+    assert entry["numeric"] == ["n"]
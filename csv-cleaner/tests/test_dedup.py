@@ -0,0 +1,48 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add src folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "../src")
+sys.path.insert(0, src_dir)
+
+from dedup import RowDeduplicator, merge_runs
+
+def test_dedup_across_chunks():
+    with RowDeduplicator() as dedup:
+        first = dedup.filter(pd.DataFrame({"x": [1, 1, 2], "y": ["a", "a", "b"]}))
+        second = dedup.filter(pd.DataFrame({"x": [2.0, 3.0], "y": ["b", "c"]}))
+    assert first["x"].tolist() == [1, 2]
+    assert second["x"].tolist() == [3.0]
+
+def test_dedup_spills_to_disk(tmp_path):
+    df = pd.DataFrame({"x": range(5000)})
+    with RowDeduplicator(memory_budget=4096, bits=128, partitions=4,
+                         spill_dir=str(tmp_path), pending_limit=100) as dedup:
+        assert len(dedup.filter(df.iloc[:3000])) == 3000
+        assert dedup.spilled_partitions > 0
+        assert len(dedup.filter(df.iloc[2000:])) == 2000
+        assert dedup.duplicates == 1000
+
+def test_merge_runs_streams_in_blocks(tmp_path):
+    rng = np.random.default_rng(0)
+    runs = [np.sort(rng.integers(0, 1000, size).astype(np.uint64)) for size in (0, 1, 50, 333)]
+    merge_runs(runs, str(tmp_path / "merged.npy"), block=7)
+    assert np.array_equal(np.load(tmp_path / "merged.npy"), np.sort(np.concatenate(runs)))
+
+def test_spilled_partitions_append_runs(tmp_path):
+    df = pd.DataFrame({"x": range(20000)})
+    with RowDeduplicator(memory_budget=2048, partitions=2, spill_dir=str(tmp_path / "spill"),
+                         pending_limit=50) as dedup:
+        for start in range(0, 20000, 500):
+            assert len(dedup.filter(df.iloc[start:start + 500])) == 500
+        # Runs are merged as they pile up: O(log n) runs, not one per spill
+        assert all(len(p.runs) <= 8 for p in dedup._partitions)
+        assert len(dedup.filter(df.iloc[::7])) == 0
+        dedup.save(str(tmp_path / "seen.npy"))
+    with RowDeduplicator(memory_budget=2048, partitions=2, spill_dir=str(tmp_path / "again")) as dedup:
+        dedup.load(str(tmp_path / "seen.npy"))
+        assert len(dedup.filter(pd.DataFrame({"x": [5, 19999, 20000]}))) == 1
+    assert os.listdir(tmp_path / "spill") == []
@@ -0,0 +1,49 @@
+import os
+import sys
+
+# Add src folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "../src")
+sys.path.insert(0, src_dir)
+
+from cleaner import stream_clean
+from incremental import incremental_clean
+
+def test_incremental_append_matches_full_run(tmp_path):
+    input_file = tmp_path / "in.csv"
+    output_file = str(tmp_path / "out.csv")
+    input_file.write_text(" Name ,Age,City\nAnn,30,Oslo\nBob,,\nAnn,30,Oslo\nCid,40,Ro")
+
+    # The unfinished last line waits for the next run
+    assert incremental_clean(str(input_file), output_file, 2, fill_method="zero") == (2, "no checkpoint")
+    with open(input_file, "a") as f:
+        f.write("me\nBob,,\nDan,5, Paris \n")
+    assert incremental_clean(str(input_file), output_file, 2, fill_method="zero") == (2, None)
+    assert incremental_clean(str(input_file), output_file, 2, fill_method="zero") == (0, None)
+
+    stream_clean(str(input_file), str(tmp_path / "full.csv"), 2, fill_method="zero")
+    assert open(output_file).read() == (tmp_path / "full.csv").read_text()
+
+def test_incremental_rebuilds_rewritten_input(tmp_path):
+    input_file = tmp_path / "in.csv"
+    output_file = str(tmp_path / "out.csv")
+    input_file.write_text("name,age\nAnn,30\nBob,40\n")
+    incremental_clean(str(input_file), output_file, fill_method="zero")
+
+    input_file.write_text("name,age\nZed,1\n")
+    assert incremental_clean(str(input_file), output_file, fill_method="zero") == (1, "input was truncated")
+
+    input_file.write_text("name,age\nAmy,2\nBen,3\n")
+    rows, reason = incremental_clean(str(input_file), output_file, fill_method="zero")
+    assert (rows, reason) == (2, "input was rewritten")
+    assert open(output_file).read() == "name,age\nAmy,2\nBen,3\n"
+
+def test_incremental_keeps_bool_columns(tmp_path):
+    input_file = tmp_path / "in.csv"
+    output_file = str(tmp_path / "out.csv")
+    input_file.write_text("id,flag\n1,True\n2,False\n")
+    incremental_clean(str(input_file), output_file, 2)
+    with open(input_file, "a") as f:
+        f.write("3,True\n")
+    incremental_clean(str(input_file), output_file, 2)
+    assert open(output_file).read() == "id,flag\n1,True\n2,False\n3,True\n"
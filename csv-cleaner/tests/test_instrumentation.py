@@ -0,0 +1,27 @@
+import json
+import os
+import sys
+
+# Add src folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(current_dir, "../src")
+sys.path.insert(0, src_dir)
+
+from instrumentation import Profiler
+
+def test_profiler_report(tmp_path):
+    profiler = Profiler("csv-cleaner")
+    for _ in range(2):
+        with profiler.stage("read_csv") as stage:
+            stage["rows"] += 10
+            stage["bytes_read"] += 100
+    profiler.add("pipeline.fill_strings", seconds=0.5, items=20, calls=2)
+    profiler.start_dump(str(tmp_path / "run.prof"))
+    profiler.write(str(tmp_path / "report.json"))
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["tool"] == "csv-cleaner"
+    assert report["bytes_read"] == 200
+    assert report["stages"]["read_csv"]["calls"] == 2
+    assert report["stages"]["pipeline.fill_strings"]["rows_per_second"] == 40
+    assert (tmp_path / "run.prof").exists()
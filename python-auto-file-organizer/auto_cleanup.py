@@ -15,17 +15,44 @@ Features:
 - Reset test folder to original sample files
 - Undo last cleanup
 - Logs and prints paths relative to project root
+- Optional JSON profile of each phase (--profile)
+- Parallel moves on a thread pool (--workers)
+- Recursive, streaming os.scandir scan (--recursive, --max-depth)
+- Undo history of every run in a SQLite journal (--undo --run ID, --history)
+- Watch mode that organizes new files as they arrive (--watch, inotify on Linux)
+- Duplicate files moved to a quarantine folder by content hash (--mode dedup, --dedup)
+- Two-phase runs: save the exact move plan, review it, apply it later (--plan, --apply)
+- Sorting by a JSON rule file: extensions, globs, regexes, size and age (--rules)
+- Resumable in-kernel copies for moves to another drive (--verify to checksum them)
 """
 
+import ctypes
+import errno
+import fnmatch
+import hashlib
+import json
+import mmap
 import os
+import queue
+import re
+import select
 import shutil
-from pathlib import Path
+import signal
+import sqlite3
+import struct
+import sys
+import time
+from pathlib import Path, PurePath
 from datetime import datetime
 import argparse
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from pathlib import Path
 
+from instrumentation import Profiler
+
 # --- Project and script paths ---
 SCRIPT_DIR = Path(__file__).parent.resolve()  # /.../python-auto-file-organizer
 HOME_DIR = Path.home()  # /home/johan
@@ -46,9 +73,30 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Undo log
+# Undo journal, and the text log of older versions (imported on first use)
+UNDO_DB_PATH = LOG_DIR / "undo.db"
 UNDO_LOG_PATH = LOG_DIR / "undo.log"
 
+# Moves recorded per journal transaction
+JOURNAL_BATCH = 1000
+
+# Default quarantine for duplicates, inside the destination folder
+DUPLICATES_FOLDER = "duplicates"
+
+# Format of --plan files
+PLAN_VERSION = 1
+
+# Moves to another file system are copied in chunks of this size; files of at
+# least PARALLEL_COPY_MIN bytes are copied on COPY_THREADS threads and resume
+# where an interrupted run stopped
+COPY_CHUNK = 16 * 1024 * 1024
+PARALLEL_COPY_MIN = 64 * 1024 * 1024
+COPY_THREADS = 4
+# Half-copied files carry this suffix and are never organized themselves
+PARTIAL_SUFFIX = ".auto_cleanup-partial"
+# Set by --verify: compare checksums of cross-device copies before deleting the original
+VERIFY_COPIES = False
+
 # Original sample files
 SAMPLE_FILES = ["document.pdf", "photo.jpg", "script.py", "notes.txt", "image.png"]
 
@@ -61,62 +109,1142 @@ def get_args():
                         help="Path to the source folder to organize")
     parser.add_argument("-d", "--destination", type=str,
                         help="Optional destination folder (default: organize in-place)")
-    parser.add_argument("-m", "--mode", choices=["extension", "date"], default="extension",
-                        help="Sorting mode: 'extension' or 'date' (default: extension)")
+    parser.add_argument("-m", "--mode", choices=["extension", "date", "dedup"], default="extension",
+                        help="Sorting mode: 'extension', 'date', or 'dedup' to only quarantine duplicates "
+                             "(default: extension)")
     parser.add_argument("--dry-run", action="store_true",
                         help="Show what would be done without moving files")
     parser.add_argument("--reset", action="store_true",
                         help="Reset the folder to original sample files")
     parser.add_argument("--undo", action="store_true",
                         help="Undo the last cleanup")
-    return parser.parse_args()
+    parser.add_argument("--run", type=int,
+                        help="With --undo, undo this run instead of the last one (see --history)")
+    parser.add_argument("--history", action="store_true",
+                        help="List the recorded cleanup runs")
+    parser.add_argument("-r", "--recursive", action="store_true",
+                        help="Also organize files in subfolders of the source folder")
+    parser.add_argument("--max-depth", type=int,
+                        help="With --recursive, only descend this many folder levels (implies --recursive)")
+    parser.add_argument("--rules", type=str,
+                        help="Sort with the rules in this JSON file instead of --mode extension/date")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Move duplicate files (same content) to the quarantine folder before sorting")
+    parser.add_argument("--quarantine", type=str,
+                        help=f"Folder for duplicates (default: '{DUPLICATES_FOLDER}' in the destination)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and organize new files as they arrive (Ctrl+C to stop)")
+    parser.add_argument("--debounce", type=float, default=2.0,
+                        help="With --watch, wait until a file was left alone this many seconds (default: 2)")
+    parser.add_argument("--sweep-empty", action="store_true",
+                        help="Afterwards, remove every empty folder under the source (scans the whole tree)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Checksum files copied to another drive before deleting the originals")
+    parser.add_argument("--plan", type=str,
+                        help="Only decide every move (final names included) and save the plan to this JSON file")
+    parser.add_argument("--apply", type=str,
+                        help="Carry out a plan saved with --plan, without scanning again")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Move files on this many threads, one target folder per thread at a time (default: 1)")
+    parser.add_argument("--profile", type=str,
+                        help="Write a JSON report of per-phase time, files/s, bytes and peak RSS here (- for stderr)")
+    parser.add_argument("--profile-dump", type=str,
+                        help="Also write a cProfile dump (.prof), or a pyinstrument report (.html)")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.run is not None and not args.undo:
+        parser.error("--run requires --undo")
+    if args.watch and (args.undo or args.reset or args.history):
+        parser.error("--watch cannot be combined with --undo, --reset or --history")
+    if args.watch and (args.dedup or args.mode == "dedup"):
+        parser.error("--watch cannot be combined with duplicate detection")
+    if (args.plan or args.apply) and (args.undo or args.reset or args.history or args.watch):
+        parser.error("--plan and --apply cannot be combined with --undo, --reset, --history or --watch")
+    if args.rules and args.mode == "date":
+        parser.error("--rules replaces --mode date; use a {date:...} folder in the rules instead")
+    if args.plan and args.apply:
+        parser.error("--plan and --apply are separate steps")
+    if args.debounce < 0:
+        parser.error("--debounce must not be negative")
+    if args.max_depth is not None:
+        if args.max_depth < 0:
+            parser.error("--max-depth must not be negative")
+        args.recursive = True
+    return args
 
 # --- Helper: print paths relative to project root ---
 def project_path(path: Path):
-    """Return path starting from project folder, with leading slash."""
+    """Return path starting from project folder, with leading slash.
+    Only relative paths are resolved: resolve() costs an lstat() per path
+    component, and this runs for every file moved."""
+    path = Path(path)
+    if not path.is_absolute():
+        path = path.resolve()
     try:
-        relative = path.resolve().relative_to(HOME_DIR)
-        return Path("/" + str(relative))
+        return Path("/" + str(path.relative_to(HOME_DIR)))
     except ValueError:
         return path  # fallback
 
-# --- Safe move with undo support ---
-def safe_move(file_path: Path, target_folder: Path, dry_run=False):
-    """Move a file safely, avoiding overwriting by appending a counter.
-    Record move in undo log if not dry-run."""
-    target_folder.mkdir(parents=True, exist_ok=True)
-    target_file = target_folder / file_path.name
-    counter = 1
-    while target_file.exists():
-        target_file = target_folder / f"{file_path.stem}_{counter}{file_path.suffix}"
-        counter += 1
-
-    if dry_run:
-        print(f"[DRY-RUN] {project_path(file_path)} -> {project_path(target_file)}")
-        logger.info(f"DRY-RUN: {project_path(file_path)} -> {project_path(target_file)}")
+# --- Undo journal ---
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    source TEXT,
+    mode TEXT,
+    status TEXT NOT NULL,
+    files INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS moves (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    seq INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    original TEXT NOT NULL,
+    PRIMARY KEY (run, seq)
+) WITHOUT ROWID;
+"""
+
+def open_journal(path: Path = None):
+    """Connect to the undo journal, creating it (and importing an old
+    undo.log) if needed."""
+    conn = sqlite3.connect(path or UNDO_DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.executescript(JOURNAL_SCHEMA)
+    if path is None and UNDO_LOG_PATH.exists():
+        import_undo_log(conn, UNDO_LOG_PATH)
+    return conn
+
+def _split_log_line(line):
+    """Split an old "target|original" line. Paths may contain "|" themselves,
+    so prefer the split whose target still exists."""
+    splits = [i for i, char in enumerate(line) if char == "|"]
+    for i in splits:
+        if Path(line[:i]).exists():
+            return line[:i], line[i + 1:]
+    return line[:splits[0]], line[splits[0] + 1:]
+
+def import_undo_log(conn, log_path: Path):
+    """Turn the undo.log of older versions into one completed run."""
+    with open(log_path, "r") as f:
+        moves = [_split_log_line(line.rstrip("\n")) for line in f if "|" in line]
+    with conn:
+        run_id = conn.execute(
+            "INSERT INTO runs (started, mode, status, files) VALUES (?, 'undo.log', 'complete', ?)",
+            (datetime.now().isoformat(timespec="seconds"), len(moves))).lastrowid
+        conn.executemany("INSERT INTO moves (run, seq, target, original) VALUES (?, ?, ?, ?)",
+                         ((run_id, seq, target, original) for seq, (target, original) in enumerate(moves)))
+    log_path.replace(log_path.with_name(log_path.name + ".imported"))
+    logger.info(f"Imported {len(moves)} moves from {log_path} as run {run_id}")
+
+class UndoJournal:
+    """Undo history of one cleanup run, kept in a SQLite database.
+
+    record() writes a batch of moves in one transaction *before* the files
+    are moved, so every file that was moved has a committed entry even if
+    the run is killed halfway. Undo skips entries whose target does not
+    exist (the move never happened). The run is created on the first
+    record() and marked complete or interrupted by close(). folders collects
+    the folders that files were moved out of, for prune_empty_folders().
+    """
+
+    def __init__(self, path: Path = None, source: Path = None, mode=None):
+        self.path = path
+        self.source = source
+        self.mode = mode
+        self.run_id = None
+        self.folders = set()
+        self._conn = None
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def record(self, moves):
+        """Record (target_file, original_file) pairs in one transaction."""
+        with self._lock:
+            rows = [(str(target_file), str(original_file)) for target_file, original_file in moves]
+            if not rows:
+                return
+            if self._conn is None:
+                self._conn = open_journal(self.path)
+            with self._conn:
+                if self.run_id is None:
+                    self.run_id = self._conn.execute(
+                        "INSERT INTO runs (started, source, mode, status) VALUES (?, ?, ?, 'running')",
+                        (datetime.now().isoformat(timespec="seconds"),
+                         str(self.source) if self.source else None, self.mode)).lastrowid
+                self._conn.executemany(
+                    "INSERT INTO moves (run, seq, target, original) VALUES (?, ?, ?, ?)",
+                    ((self.run_id, self._seq + i, target, original) for i, (target, original) in enumerate(rows)))
+                self._conn.execute("UPDATE runs SET files = files + ? WHERE id = ?", (len(rows), self.run_id))
+            self._seq += len(rows)
+            self.folders.update(os.path.dirname(original) for _, original in rows)
+
+    def close(self, status="complete"):
+        if self._conn is None:
+            return
+        with self._conn:
+            self._conn.execute("UPDATE runs SET status = ? WHERE id = ?", (status, self.run_id))
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close("complete" if exc_type is None else "interrupted")
+
+# Keeps move messages from different workers on separate lines
+_print_lock = threading.Lock()
+
+# Windows and macOS file systems usually ignore case in file names
+CASE_INSENSITIVE = sys.platform in ("win32", "darwin")
+
+# --- Target name index ---
+class TargetNames:
+    """Hands out free file names in target folders without probing the disk.
+
+    The names in a folder are read with one os.scandir the first time it is
+    used, and every name handed out is added to the set. Clashes get the next
+    free stem_k.suffix from a counter kept per (folder, name), so moving N
+    files with the same name costs O(N) instead of O(N^2) exists() calls.
+    Safe to share between worker threads. With verify, every free name is
+    also checked on disk once, for indexes that live long enough (watch
+    mode) for other programs to add files to the target folders.
+    """
+
+    def __init__(self, verify=False):
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._folders = {}  # target folder -> {"lock", "names", "counters"}
+
+    @staticmethod
+    def _key(name):
+        return name.casefold() if CASE_INSENSITIVE else name
+
+    def _scan(self, target_folder: Path):
+        try:
+            with os.scandir(target_folder) as entries:
+                return {self._key(entry.name) for entry in entries}
+        except FileNotFoundError:
+            return set()
+
+    def _taken(self, target_folder: Path, names, name):
+        key = self._key(name)
+        if key in names:
+            return True
+        if self.verify and os.path.lexists(target_folder / name):
+            names.add(key)
+            return True
+        return False
+
+    def reserve(self, target_folder: Path, name: str) -> Path:
+        """Return a path in target_folder for a file called name that no other
+        file (or earlier reservation) uses, and reserve it."""
+        with self._lock:
+            folder = self._folders.get(target_folder)
+            if folder is None:
+                folder = self._folders[target_folder] = {"lock": threading.Lock(), "names": None, "counters": {}}
+        with folder["lock"]:
+            if folder["names"] is None:
+                folder["names"] = self._scan(target_folder)
+            names, counters = folder["names"], folder["counters"]
+            key = self._key(name)
+            if not self._taken(target_folder, names, name):
+                names.add(key)
+                return target_folder / name
+            stem, suffix = PurePath(name).stem, PurePath(name).suffix
+            counter = counters.get(key, 1)
+            while self._taken(target_folder, names, f"{stem}_{counter}{suffix}"):
+                counter += 1
+            counters[key] = counter + 1
+            candidate = f"{stem}_{counter}{suffix}"
+            names.add(self._key(candidate))
+            return target_folder / candidate
+
+# --- Thread lanes ---
+def run_in_lanes(items, lane_key, action, workers=1, queue_size=1024):
+    """Call action(item) for every item of a (possibly lazy) iterable.
+
+    With workers > 1, items with the same lane_key(item) always go to the
+    same worker thread and run in order, while different keys run in
+    parallel. Each worker has a bounded queue, so a fast producer never gets
+    far ahead of the workers and memory stays flat. The first error stops
+    the run and is re-raised here.
+    """
+    if workers == 1:
+        for item in items:
+            action(item)
+        return
+
+    lanes = [queue.Queue(maxsize=queue_size) for _ in range(workers)]
+    lane_of = {}  # lane key -> index of the worker that owns it
+    errors = []
+
+    def worker(lane):
+        while True:
+            item = lane.get()
+            if item is None:
+                return
+            if errors:
+                continue  # keep draining so the producer never blocks on a full queue
+            try:
+                action(item)
+            except Exception as e:  # re-raised in the main thread
+                errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(lane,), daemon=True) for lane in lanes]
+    for thread in threads:
+        thread.start()
+    try:
+        for item in items:
+            if errors:
+                break
+            key = lane_key(item)
+            lane = lane_of.setdefault(key, len(lane_of) % workers)
+            lanes[lane].put(item)
+    finally:
+        for lane in lanes:
+            lane.put(None)
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+# --- Cross-device moves ---
+_copy_pool = None
+_copy_pool_lock = threading.Lock()
+
+def copy_pool():
+    """Thread pool shared by all large copies, so the number of parallel
+    copy streams stays at COPY_THREADS however many workers move files."""
+    global _copy_pool
+    with _copy_pool_lock:
+        if _copy_pool is None:
+            _copy_pool = ThreadPoolExecutor(COPY_THREADS, thread_name_prefix="copy")
+        return _copy_pool
+
+def copy_range(source: Path, target: Path, offset, count, sync=False):
+    """Copy count bytes at offset from source into the same place in target.
+
+    Uses os.copy_file_range, then os.sendfile (both copy inside the kernel),
+    and falls back to a buffered copy where neither works. Every call opens
+    its own file handles, so ranges of one file can be copied in parallel.
+    Raises OSError when the source ends before the range does. With sync,
+    the target is fsynced before returning.
+    """
+    with open(source, "rb") as src, open(target, "r+b") as dst:
+        end = offset + count
+        copied_in_kernel = False
+        if hasattr(os, "copy_file_range"):
+            try:
+                while offset < end:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), end - offset, offset, offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                copied_in_kernel = True
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM):
+                    raise
+        if not copied_in_kernel and hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+            try:
+                dst.seek(offset)
+                while offset < end:
+                    copied = os.sendfile(dst.fileno(), src.fileno(), offset, end - offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                copied_in_kernel = True
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EINVAL):
+                    raise
+        if not copied_in_kernel:
+            src.seek(offset)
+            dst.seek(offset)
+            buffer = memoryview(bytearray(1024 * 1024))
+            while offset < end:
+                read = src.readinto(buffer[:min(len(buffer), end - offset)])
+                if not read:
+                    break
+                dst.write(buffer[:read])
+                offset += read
+        if offset < end:
+            raise OSError(f"{source} ended after {offset} bytes, expected {end}")
+        if sync:
+            dst.flush()
+            os.fsync(dst.fileno())
+
+def _unchanged(path: Path, stat):
+    """True when path still has the size and mtime of an earlier stat."""
+    now = path.stat()
+    return now.st_size == stat.st_size and now.st_mtime_ns == stat.st_mtime_ns
+
+def copy_across(source: Path, target: Path, verify=False):
+    """Move source to target on another file system.
+
+    The data goes to a hidden partial file next to target first, which is
+    renamed to target when complete; the original is deleted last, so an
+    interruption never leaves a half-copied file under the final name.
+    Large files are copied in COPY_CHUNK pieces on copy_pool(), and the
+    pieces are logged once they are on disk, so the next run copies only
+    what is missing. The original is only deleted when the copy has its
+    full size and the original did not change while it was copied.
+    """
+    stat = source.stat()
+    size = stat.st_size
+    # The source's size and mtime are in the name, so a changed source starts over
+    stem = f".{target.name}.{size:x}-{stat.st_mtime_ns:x}"
+    partial = target.with_name(stem + PARTIAL_SUFFIX)
+    chunk_log = target.with_name(stem + ".chunks" + PARTIAL_SUFFIX)
+    chunks = range((size + COPY_CHUNK - 1) // COPY_CHUNK)
+
+    def discard(reason):
+        partial.unlink()
+        if chunk_log.exists():
+            chunk_log.unlink()
+        raise OSError(f"{reason}; {source} was left in place")
+
+    if size < PARALLEL_COPY_MIN:
+        with open(partial, "wb"):
+            pass
+        try:
+            copy_range(source, partial, 0, size)
+        except OSError:
+            partial.unlink()  # small copies start over anyway
+            raise
     else:
-        shutil.move(str(file_path), str(target_file))
-        print(f"Moved: {project_path(file_path)} -> {project_path(target_file)}")
-        logger.info(f"Moved: {project_path(file_path)} -> {project_path(target_file)}")
-        # Record for undo
-        with open(UNDO_LOG_PATH, "a") as f:
-            f.write(f"{target_file}|{file_path}\n")  # target_file -> original location
+        done = set()
+        if partial.exists() and chunk_log.exists():
+            with open(chunk_log) as f:
+                done = {int(line) for line in f if line.strip().isdigit()}
+            logger.info(f"Resuming copy of {source}: {len(done)} of {len(chunks)} chunks done")
+        else:
+            with open(partial, "wb") as f:
+                f.truncate(size)
+        log_lock = threading.Lock()
+        with open(chunk_log, "a") as log:
+            def copy_chunk(chunk):
+                offset = chunk * COPY_CHUNK
+                # Synced first: a resumed copy must never trust a chunk that is not on disk
+                copy_range(source, partial, offset, min(COPY_CHUNK, size - offset), sync=True)
+                with log_lock:
+                    log.write(f"{chunk}\n")
+                    log.flush()
+
+            print(f"Copying {project_path(source)} ({size / 1024 ** 2:.0f} MB) to another drive")
+            list(copy_pool().map(copy_chunk, [chunk for chunk in chunks if chunk not in done]))
+
+    with open(partial, "rb+") as f:
+        os.fsync(f.fileno())
+        copied = os.fstat(f.fileno()).st_size
+    if copied != size:
+        discard(f"Copy of {source} has {copied} bytes, expected {size}")
+    if not _unchanged(source, stat):
+        discard(f"{source} changed while it was copied")
+    shutil.copystat(source, partial)
+    if verify and content_hash(source) != content_hash(partial):
+        discard(f"Checksum mismatch after copying {source} to {target}")
+    os.replace(partial, target)
+    if chunk_log.exists():
+        chunk_log.unlink()
+    if not _unchanged(source, stat):
+        target.unlink()
+        raise OSError(f"{source} changed while it was copied; it was left in place")
+    source.unlink()
+
+def relocate(source: Path, target: Path, verify=None):
+    """Rename source to target, or copy it over when target is on another
+    file system (see copy_across)."""
+    try:
+        os.rename(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        copy_across(source, target, VERIFY_COPIES if verify is None else verify)
+
+# --- Safe move with undo support ---
+def move_file(file_path: Path, target_file: Path, dry_run=False):
+    """Move a file to a free path reserved for it, and report the move."""
+    if not dry_run:
+        relocate(file_path, target_file)
+    shown = f"{project_path(file_path)} -> {project_path(target_file)}"
+    with _print_lock:
+        print(f"[DRY-RUN] {shown}" if dry_run else f"Moved: {shown}")
+    logger.info(f"DRY-RUN: {shown}" if dry_run else f"Moved: {shown}")
+
+def move_files(moves, dry_run=False, workers=1, journal=None, queue_size=1024, names=None, plan=None):
+    """Move (file_path, target_folder) pairs, recording them in the undo journal.
+
+    moves may be a lazy iterator; it is consumed as the moves happen. Target
+    names are reserved as the pairs arrive, then moved by execute_moves().
+    With a MovePlan as plan, the decided moves are only added to it.
+    """
+    if names is None:
+        names = TargetNames()
+    if plan is not None:
+        for file_path, target_folder in moves:
+            plan.add(file_path, names.reserve(target_folder, file_path.name))
+        return
+    reserved = ((file_path, names.reserve(target_folder, file_path.name)) for file_path, target_folder in moves)
+    execute_moves(reserved, dry_run, workers, journal, queue_size)
+
+def execute_moves(moves, dry_run=False, workers=1, journal=None, queue_size=1024, created=None, verify=False):
+    """Move (file_path, target_file) pairs whose target names are decided.
+
+    The moves are journaled JOURNAL_BATCH at a time, one transaction per
+    batch, before those files are moved. With workers > 1, every target
+    folder is owned by one worker thread (see run_in_lanes), which creates
+    it once (unless it is in created) and fills it in order. With verify,
+    moves whose file is gone or whose target is taken are skipped instead
+    of failing or overwriting. Returns the number of files moved.
+    """
+    if journal is None:
+        with UndoJournal() as journal:
+            return execute_moves(moves, dry_run, workers, journal, queue_size, created, verify)
+
+    created = set(created or ())
+    moved = 0
+    count_lock = threading.Lock()
+
+    def batches():
+        batch = []
+        for move in moves:
+            batch.append(move)
+            if len(batch) >= JOURNAL_BATCH:
+                yield from journaled(batch)
+                batch = []
+        yield from journaled(batch)
+
+    def journaled(batch):
+        if not dry_run:
+            journal.record((target_file, file_path) for file_path, target_file in batch)
+        return batch
+
+    def move(item):
+        nonlocal moved
+        file_path, target_file = item
+        if verify and not dry_run and (not file_path.exists() or os.path.lexists(target_file)):
+            print(f"Skipped: {project_path(file_path)} (file is gone or target is taken)")
+            logger.warning(f"Skipped planned move {file_path} -> {target_file}")
+            return
+        if target_file.parent not in created:  # only this item's worker fills the folder
+            if not dry_run:
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+            created.add(target_file.parent)
+        move_file(file_path, target_file, dry_run)
+        with count_lock:
+            moved += 1
+
+    run_in_lanes(batches(), lambda item: item[1].parent, move, workers, queue_size)
+    return moved
+
+# --- Move plans ---
+class MovePlan:
+    """Every move of a run, decided up front: (file, target file) pairs in
+    order, final names included, and the number of files per target folder."""
+
+    def __init__(self):
+        self.moves = []
+        self.folders = {}  # target folder -> files moved into it
+        self.sources = set()
+
+    def add(self, file_path: Path, target_file: Path):
+        self.moves.append((str(file_path), str(target_file)))
+        self.sources.add(file_path)
+        folder = str(target_file.parent)
+        self.folders[folder] = self.folders.get(folder, 0) + 1
+
+    def save(self, path, **info):
+        """Write the plan as JSON; info (source, mode, ...) is stored with it."""
+        plan = {"version": PLAN_VERSION, "created": datetime.now().isoformat(timespec="seconds"), **info,
+                "files": len(self.moves), "folders": self.folders, "moves": self.moves}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plan, f, indent=1)
+
+def load_plan(path):
+    with open(path, encoding="utf-8") as f:
+        plan = json.load(f)
+    if plan.get("version") != PLAN_VERSION:
+        raise ValueError(f"'{path}' is not a plan written by this version of auto_cleanup")
+    return plan
+
+def apply_plan(plan, dry_run=False, workers=1):
+    """Carry out a loaded plan: create all its target folders first (parents
+    before children), then move the files on `workers` threads in one undo
+    run. Files that changed since planning are skipped. Returns the number
+    of files moved."""
+    folders = sorted(Path(folder) for folder in plan["folders"])
+    if not dry_run:
+        for folder in folders:
+            folder.mkdir(parents=True, exist_ok=True)
+    moves = ((Path(file_path), Path(target_file)) for file_path, target_file in plan["moves"])
+    with UndoJournal(source=plan.get("source"), mode=f"apply {plan.get('mode')}") as journal:
+        files = execute_moves(moves, dry_run, workers, journal, created=folders, verify=True)
+    if journal.run_id is not None:
+        print(f"Recorded as run {journal.run_id} (undo with --undo --run {journal.run_id})")
+    prune_empty_folders(journal.folders, Path(plan["source"]))
+    return files
+
+# --- Scanning ---
+def scan_files(folder: Path, recursive=False, max_depth=None, skip=()):
+    """Yield an os.DirEntry for every file under folder, lazily.
+
+    Built on os.scandir: is_file()/is_dir() use the file type the directory
+    listing already returned, and entry.stat() is cached on the entry.
+    With recursive, subfolders are walked depth-first up to max_depth levels
+    below folder (None = no limit). Folders in skip and symlinked folders
+    are not entered.
+    """
+    skip = {os.path.normcase(os.fspath(path)) for path in skip}
+    stack = [(os.fspath(folder), 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        if not entry.name.endswith(PARTIAL_SUFFIX):
+                            yield entry
+                    elif (recursive and (max_depth is None or depth < max_depth)
+                          and entry.is_dir(follow_symlinks=False)
+                          and os.path.normcase(entry.path) not in skip):
+                        stack.append((entry.path, depth + 1))
+        except PermissionError:
+            print(f"Skipped unreadable folder: {path}")
+            logger.warning(f"Skipped unreadable folder: {path}")
 
 # --- Organize functions ---
-def organize_by_extension(source_folder: Path, destination_folder: Path, dry_run=False):
-    for item in source_folder.iterdir():
-        if item.is_file():
-            ext = item.suffix[1:] if item.suffix else "no_extension"
-            target_folder = destination_folder / ext
-            safe_move(item, target_folder, dry_run=dry_run)
-
-def organize_by_date(source_folder: Path, destination_folder: Path, dry_run=False):
-    for item in source_folder.iterdir():
-        if item.is_file():
-            mod_time = datetime.fromtimestamp(item.stat().st_mtime)
-            date_folder = mod_time.strftime("%Y-%m-%d")
-            target_folder = destination_folder / date_folder
-            safe_move(item, target_folder, dry_run=dry_run)
+def extension_folder(entry):
+    suffix = PurePath(entry.name).suffix
+    return suffix[1:] if suffix else "no_extension"
+
+def date_folder(entry):
+    return datetime.fromtimestamp(entry.stat().st_mtime).strftime("%Y-%m-%d")
+
+# --- Classification rules ---
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2,
+              "G": 1024 ** 3, "GB": 1024 ** 3, "T": 1024 ** 4, "TB": 1024 ** 4}
+RULE_KEYS = {"name", "folder", "extensions", "glob", "regex", "min_size", "max_size",
+             "min_age_days", "max_age_days"}
+
+def parse_size(value):
+    """Bytes from 1048576, "1MB", "1.5 GB" or "500k" (units are powers of 1024)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", str(value))
+    if not match or match.group(2).upper() not in SIZE_UNITS:
+        raise ValueError(f"Invalid size '{value}'")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def _folder_template(template, where):
+    if not isinstance(template, str):
+        raise ValueError(f"{where}: folder must be a string, not {template!r}")
+    try:
+        parts = PurePath(template.format(ext="ext", date=datetime.now(), rule="rule")).parts
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"{where}: invalid folder '{template}' ({e!r})") from None
+    if PurePath(template).is_absolute() or ".." in parts:
+        raise ValueError(f"{where}: folder '{template}' must stay inside the destination")
+    return template
+
+class Rule:
+    """One compiled rule: all of its conditions must match. A condition with
+    a list (extensions, glob, regex) matches when any of its entries does."""
+
+    def __init__(self, spec, index):
+        unknown = set(spec) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Rule {index + 1}: unknown keys {', '.join(sorted(unknown))}")
+        if "folder" not in spec:
+            raise ValueError(f"Rule {index + 1}: 'folder' is required")
+        self.name = spec.get("name", f"rule {index + 1}")
+        where = f"Rule '{self.name}'"
+        self.folder = _folder_template(spec["folder"], where)
+        self.extensions = None if spec.get("extensions") is None else {
+            ext.lower().lstrip(".") for ext in _strings(spec, "extensions", where)}
+        # The globs and the regexes each become one case-insensitive regex on the file name
+        self.patterns = tuple(
+            re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+            for patterns in ([fnmatch.translate(glob) for glob in _strings(spec, "glob", where)],
+                             _strings(spec, "regex", where))
+            if patterns)
+        self.min_size = _size(spec, "min_size", where)
+        self.max_size = _size(spec, "max_size", where)
+        self.min_age = _days(spec, "min_age_days", where)
+        self.max_age = _days(spec, "max_age_days", where)
+        self.needs_stat = any(v is not None for v in (self.min_size, self.max_size, self.min_age, self.max_age))
+
+    def matches(self, name, entry, now):
+        for pattern in self.patterns:
+            if not pattern.fullmatch(name):
+                return False
+        if not self.needs_stat:
+            return True
+        stat = entry.stat()
+        if self.min_size is not None and stat.st_size < self.min_size:
+            return False
+        if self.max_size is not None and stat.st_size > self.max_size:
+            return False
+        age = now - stat.st_mtime
+        if self.min_age is not None and age < self.min_age:
+            return False
+        return self.max_age is None or age <= self.max_age
+
+def _as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _strings(spec, key, where):
+    """A rule value that is one string or a list of strings, as a list."""
+    values = _as_list(spec.get(key))
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError(f"{where}: '{key}' must be a string or a list of strings")
+    return values
+
+def _size(spec, key, where):
+    if key not in spec:
+        return None
+    value = spec[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{where}: '{key}' must be a number of bytes or a size like \"500KB\"")
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise ValueError(f"{where}: '{key}': {e}") from None
+
+def _days(spec, key, where):
+    if key not in spec:
+        return None
+    value = spec[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{where}: '{key}' must be a number of days, not {value!r}")
+    return value * 86400
+
+class RuleSet:
+    """Rules from a JSON file, compiled once and used as folder_for.
+
+    {"rules": [{"name": "photos", "extensions": ["jpg", "png"], "folder": "Photos/{date:%Y}"},
+               {"name": "big", "min_size": "1GB", "folder": "Large"}],
+     "default": "{ext}"}
+
+    The first rule that matches a file picks its folder. Folders may use
+    {ext}, {rule} and {date:<strftime format>} (modification time). Files
+    no rule matches go to "default", or stay where they are when it is null.
+    Rules are looked up by lowercased suffix in a dict, so a file is only
+    checked against the rules for its extension plus the rules without an
+    extension list; stat() is only called for size and age conditions.
+    """
+
+    def __init__(self, rules, default="{ext}"):
+        self.rules = [Rule(spec, i) for i, spec in enumerate(rules)]
+        self.default = None if default is None else _folder_template(default, "default")
+        self.hits = {rule.name: 0 for rule in self.rules}
+        self.unmatched = 0
+        # Rules without an extension list apply to every suffix
+        self.generic = tuple(rule for rule in self.rules if rule.extensions is None)
+        self.by_suffix = {}
+        for ext in {ext for rule in self.rules for ext in rule.extensions or ()}:
+            self.by_suffix[ext] = tuple(rule for rule in self.rules
+                                        if rule.extensions is None or ext in rule.extensions)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            spec = json.load(f)
+        if not isinstance(spec, dict) or not isinstance(spec.get("rules"), list):
+            raise ValueError(f"'{path}' must contain an object with a \"rules\" list")
+        return cls(spec["rules"], spec.get("default", "{ext}"))
+
+    def __call__(self, entry):
+        name = entry.name
+        suffix = PurePath(name).suffix
+        now = time.time()
+        for rule in self.by_suffix.get(suffix[1:].lower(), self.generic):
+            if rule.matches(name, entry, now):
+                self.hits[rule.name] += 1
+                return self._folder(rule.folder, entry, suffix, rule.name)
+        self.unmatched += 1
+        if self.default is None:
+            return None
+        return self._folder(self.default, entry, suffix, "default")
+
+    def _folder(self, template, entry, suffix, rule):
+        date = datetime.fromtimestamp(entry.stat().st_mtime) if "{date" in template else None
+        return template.format(ext=suffix[1:] if suffix else "no_extension", date=date, rule=rule)
+
+    def report(self, profiler=None):
+        """Print (and add to the profile) how many files each rule matched."""
+        print("Rule hits:")
+        for name, hits in [*self.hits.items(), ("(no rule)", self.unmatched)]:
+            print(f"  {name}: {hits}")
+            if profiler is not None:
+                profiler.add(f"rule {name}", items=hits, calls=0)
+        logger.info(f"Rule hits: {self.hits} | no rule: {self.unmatched}")
+
+def organize(source_folder: Path, destination_folder: Path, folder_for, dry_run=False, workers=1,
+             recursive=False, max_depth=None, measure_bytes=False, mode=None, entries=None,
+             journal=None, names=None, skip=(), plan=None, exclude=()):
+    """Move each file under source_folder to destination_folder / folder_for(entry).
+    Files are moved while the scan is still running. Returns (files moved,
+    bytes moved); bytes are only summed with measure_bytes, which costs a
+    stat() per file where the listing does not provide one.
+
+    entries (os.DirEntry or Path objects) replaces the scan of source_folder;
+    an open journal and TargetNames can be shared between calls (watch mode).
+    skip lists more folders not to scan (the quarantine). With a MovePlan as
+    plan, the moves are only planned; files it already moves are left out,
+    like the paths in exclude (duplicates a dry run only reported).
+    """
+    totals = [0, 0]
+    if entries is None:
+        # A destination inside the source must not be scanned again
+        skip = list(skip) + ([destination_folder] if destination_folder != source_folder else [])
+        entries = scan_files(source_folder, recursive, max_depth, skip)
+
+    def moves():
+        for entry in entries:
+            file_path = Path(entry)
+            folder = folder_for(entry)
+            if folder is None:
+                continue  # no rule for this file
+            target_folder = destination_folder / folder
+            if file_path.parent == target_folder:
+                continue  # already organized
+            if file_path in exclude or (plan is not None and file_path in plan.sources):
+                continue  # quarantined (or planned) as a duplicate
+            totals[0] += 1
+            if measure_bytes:
+                totals[1] += entry.stat().st_size
+            yield file_path, target_folder
+
+    if journal is not None or plan is not None:
+        move_files(moves(), dry_run=dry_run, workers=workers, journal=journal, names=names, plan=plan)
+        return totals[0], totals[1]
+    with UndoJournal(source=source_folder, mode=mode) as journal:
+        move_files(moves(), dry_run=dry_run, workers=workers, journal=journal, names=names)
+        if journal.run_id is not None:
+            print(f"Recorded as run {journal.run_id} (undo with --undo --run {journal.run_id})")
+    return totals[0], totals[1]
+
+def organize_by_extension(source_folder: Path, destination_folder: Path, dry_run=False, workers=1,
+                          recursive=False, max_depth=None, measure_bytes=False):
+    return organize(source_folder, destination_folder, extension_folder, dry_run, workers,
+                    recursive, max_depth, measure_bytes, mode="extension")
+
+def organize_by_date(source_folder: Path, destination_folder: Path, dry_run=False, workers=1,
+                     recursive=False, max_depth=None, measure_bytes=False):
+    return organize(source_folder, destination_folder, date_folder, dry_run, workers,
+                    recursive, max_depth, measure_bytes, mode="date")
+
+# --- Duplicate detection ---
+# Bytes hashed at each end of a file before hashing it in full
+DEDUP_BLOCK = 64 * 1024
+# Bytes of a memory map handed to the hash at once
+HASH_SLICE = 8 * 1024 * 1024
+
+def edge_hash(path, size, block=DEDUP_BLOCK):
+    """Hash of the first and last block of a file (its whole content when it
+    is at most two blocks long)."""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        if size <= 2 * block:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(block))
+            f.seek(size - block)
+            digest.update(f.read(block))
+    return digest.digest()
+
+def content_hash(path):
+    """Hash of a whole file, read through a memory map (no copies into
+    Python; hashlib releases the GIL, so threads hash in parallel)."""
+    digest = hashlib.blake2b()
+    if os.path.getsize(path) == 0:
+        return digest.digest()  # empty files cannot be mapped
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if hasattr(mapped, "madvise"):
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            for start in range(0, len(view), HASH_SLICE):
+                digest.update(view[start:start + HASH_SLICE])
+    return digest.digest()
+
+def _regroup(pool, groups, key):
+    """Split each group of (mtime, path) by key(size, path) and keep the
+    parts with more than one file. Unreadable files are dropped."""
+    def safe_key(item):
+        size, (_, path) = item
+        try:
+            return key(size, path)
+        except OSError as e:
+            logger.warning(f"Skipped {path} while looking for duplicates: {e}")
+            return None
+
+    items = [(size, file) for size, files in groups for file in files]
+    regrouped = {}
+    for (size, file), digest in zip(items, pool.map(safe_key, items)):
+        if digest is not None:
+            regrouped.setdefault((size, digest), []).append(file)
+    return [(size, files) for (size, _), files in regrouped.items() if len(files) > 1]
+
+def _one_per_file(entries):
+    """Keep one entry per file: hard links share (st_dev, st_ino)."""
+    files = {}
+    for entry in entries:
+        stat = entry.stat()
+        if not stat.st_ino:
+            stat = os.stat(entry.path)  # Windows listings leave the inode out
+        files.setdefault((stat.st_dev, stat.st_ino), entry)
+    return list(files.values())
+
+def find_duplicates(entries, workers=1, block=DEDUP_BLOCK):
+    """Return the groups of identical files among entries, as lists of paths
+    with the file to keep (the oldest) first.
+
+    Only files of the same size can be equal, so files are grouped by size
+    first (from the scan's stat). Candidates are then split by a hash of
+    their first and last block, and only files that still match are hashed
+    in full. Both hashing steps run on `workers` threads. Empty files are
+    not treated as duplicates. Symlinks are skipped (moving a link's target
+    away would leave it dangling), and hard links to the same file count
+    as that one file.
+    """
+    by_size = {}
+    for entry in entries:
+        if entry.is_symlink():
+            continue
+        stat = entry.stat()
+        if stat.st_size:
+            by_size.setdefault(stat.st_size, []).append(entry)
+    groups = []
+    for size, same_size in by_size.items():
+        if len(same_size) > 1:
+            files = [(entry.stat().st_mtime, entry.path) for entry in _one_per_file(same_size)]
+            if len(files) > 1:
+                groups.append((size, files))
+
+    with ThreadPoolExecutor(workers) as pool:
+        groups = _regroup(pool, groups, lambda size, path: edge_hash(path, size, block))
+        done = [group for group in groups if group[0] <= 2 * block]  # edge hash covered everything
+        large = [group for group in groups if group[0] > 2 * block]
+        groups = done + _regroup(pool, large, lambda size, path: content_hash(path))
+    return [[path for _, path in sorted(files)] for _, files in groups]
+
+def quarantine_duplicates(source_folder: Path, quarantine_folder: Path, dry_run=False, workers=1,
+                          recursive=False, max_depth=None, journal=None, skip=(), plan=None, quarantined=None):
+    """Move every duplicate under source_folder to quarantine_folder, keeping
+    the oldest copy in place. Returns (files moved, bytes moved). The paths
+    of the duplicates are added to the quarantined set."""
+    entries = scan_files(source_folder, recursive, max_depth, [quarantine_folder, *skip])
+    groups = find_duplicates(entries, workers)
+    duplicates = [Path(path) for group in groups for path in group[1:]]
+    if quarantined is not None:
+        quarantined.update(duplicates)
+    size = sum(path.stat().st_size for path in duplicates)
+    print(f"Found {len(duplicates)} duplicate files ({size} bytes) in {len(groups)} groups")
+    logger.info(f"Found {len(duplicates)} duplicates ({size} bytes) in {len(groups)} groups under {source_folder}")
+    move_files(((path, quarantine_folder) for path in duplicates), dry_run=dry_run, workers=workers,
+               journal=journal, plan=plan)
+    return len(duplicates), size
+
+# --- Watch mode ---
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event without its variable-length name
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class Inotify:
+    """Minimal Linux inotify binding through ctypes (no extra packages)."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            self._raise_errno()
+        self.folders = {}  # watch descriptor -> folder
+
+    def _raise_errno(self, path=None):
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err), path)
+
+    def add_watch(self, folder, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(folder), mask)
+        if wd < 0:
+            self._raise_errno(folder)
+        self.folders[wd] = folder
+
+    def read(self, timeout=None):
+        """Return the (folder, name, mask) events that arrive within timeout
+        seconds. folder is None for IN_Q_OVERFLOW."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_IGNORED:
+                self.folders.pop(wd, None)
+                continue
+            events.append((self.folders.get(wd), name, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+def _stop_watching(signum, frame):
+    raise KeyboardInterrupt
+
+def watch(source_folder: Path, destination_folder: Path, mode="extension", dry_run=False, workers=1,
+          recursive=False, max_depth=None, debounce=2.0, skip=(), rules=None):
+    """Organize source_folder, then keep organizing files as they arrive
+    until Ctrl+C or SIGTERM. Returns the number of files moved.
+
+    On Linux, inotify reports files that were closed after writing or moved
+    in, so the work done follows the arrivals, not the size of the folder.
+    A file is moved once it had no events for `debounce` seconds. Elsewhere
+    (or when inotify is unavailable) the folder is rescanned every
+    `debounce` seconds (at least 1) and files are moved once their
+    modification time is that old. The whole session is one undo run.
+    A RuleSet as rules replaces mode.
+    """
+    folder_for = rules or (extension_folder if mode == "extension" else date_folder)
+    skip = {os.fspath(folder) for folder in skip}
+    if destination_folder != source_folder:
+        skip.add(os.fspath(destination_folder))
+    names = TargetNames(verify=True)
+    files = 0
+    pending = {}  # path -> time.monotonic() of its last event
+    reported = set()  # dry-run files already shown by a rescan
+    depths = {}  # watched folder -> levels below source_folder
+
+    try:
+        inotify = Inotify()
+    except OSError as e:
+        inotify = None
+        print(f"inotify is not available ({e}); checking the folder every {max(debounce, 1):g}s instead")
+        logger.info(f"Watch falls back to polling: {e}")
+
+    def watch_tree(folder, depth):
+        """Watch folder (and its subfolders with recursive), and queue the files already in it."""
+        stack = [(folder, depth)]
+        while stack:
+            folder, depth = stack.pop()
+            try:
+                inotify.add_watch(folder)
+            except OSError as e:
+                print(f"Cannot watch {project_path(Path(folder))}: {e.strerror}")
+                logger.warning(f"Cannot watch {folder}: {e}")
+                continue
+            depths[folder] = depth
+            if depth == 0:
+                continue  # the initial scan handles the source folder itself
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_file():
+                            pending[entry.path] = time.monotonic()
+                        elif descend(entry.path, depth) and entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, depth + 1))
+            except OSError:
+                pass  # removed again before we got to it
+
+    def descend(folder, depth):
+        return recursive and (max_depth is None or depth < max_depth) and folder not in skip
+
+    def full_scan():
+        """Move the files that were left alone for debounce seconds; queue the rest."""
+        nonlocal files
+        quiet = []
+        cutoff = time.time() - debounce
+        for entry in scan_files(source_folder, recursive, max_depth, skip):
+            if entry.stat().st_mtime <= cutoff:
+                quiet.append(entry)
+            elif inotify is not None:
+                pending[entry.path] = time.monotonic()
+        if dry_run:
+            quiet = [entry for entry in quiet if entry.path not in reported]
+            reported.update(entry.path for entry in quiet)
+        files += organize(source_folder, destination_folder, folder_for, dry_run, workers,
+                          entries=quiet, journal=journal, names=names)[0]
+
+    previous_handler = signal.signal(signal.SIGTERM, _stop_watching)
+    with UndoJournal(source=source_folder, mode=f"watch {'rules' if rules else mode}") as journal:
+        try:
+            if inotify is not None:
+                # Watch first, so files arriving during the initial scan are not missed
+                watch_tree(os.fspath(source_folder), 0)
+                if recursive:
+                    with os.scandir(source_folder) as entries:
+                        subfolders = [entry.path for entry in entries
+                                      if descend(entry.path, 0) and entry.is_dir(follow_symlinks=False)]
+                    for subfolder in subfolders:
+                        watch_tree(subfolder, 1)
+            full_scan()
+            print(f"Watching {project_path(source_folder)} (Ctrl+C to stop)")
+            logger.info(f"Watching {source_folder} | mode={mode} | dry_run={dry_run}")
+
+            while True:
+                if inotify is None:
+                    time.sleep(max(debounce, 1))
+                    full_scan()
+                    continue
+
+                timeout = None
+                if pending:
+                    timeout = max(0.0, min(pending.values()) + debounce - time.monotonic())
+                for folder, name, mask in inotify.read(timeout):
+                    if mask & IN_Q_OVERFLOW:
+                        full_scan()  # events were lost
+                        continue
+                    if folder is None:
+                        continue
+                    path = os.path.join(folder, name)
+                    if name.endswith(PARTIAL_SUFFIX):
+                        continue  # a copy to this folder that is still running
+                    if mask & IN_ISDIR:
+                        if mask & (IN_CREATE | IN_MOVED_TO) and descend(path, depths.get(folder, 0)):
+                            watch_tree(path, depths.get(folder, 0) + 1)
+                    elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) or path in pending:
+                        pending[path] = time.monotonic()
+
+                now = time.monotonic()
+                ready = [path for path, last in pending.items() if now - last >= debounce]
+                for path in ready:
+                    del pending[path]
+                entries = [Path(path) for path in ready if os.path.isfile(path)]
+                if entries:
+                    files += organize(source_folder, destination_folder, folder_for, dry_run, workers,
+                                      entries=entries, journal=journal, names=names)[0]
+        except KeyboardInterrupt:
+            print("Stopped watching.")
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            if inotify is not None:
+                inotify.close()
+        if journal.run_id is not None:
+            print(f"Recorded as run {journal.run_id} (undo with --undo --run {journal.run_id})")
+    logger.info(f"Stopped watching {source_folder} after {files} files")
+    return files
 
 # --- Reset folder ---
 def reset_folder(folder: Path):
@@ -139,16 +1267,41 @@ def reset_folder(folder: Path):
         if not file_path.exists():
             file_path.touch()
 
-    # Clear undo log
-    if UNDO_LOG_PATH.exists():
-        UNDO_LOG_PATH.unlink()
-
     print(f"'{project_path(folder)}' has been reset to original state.")
     logger.info(f"Reset folder: {project_path(folder)}")
 
 
+def prune_empty_folders(folders, root: Path):
+    """Remove the given folders if they are empty now, then their parents
+    inside root (never root itself), deepest first. Each folder gets one
+    rmdir attempt and nothing else is scanned, so the cost follows the
+    folders a run touched, not the size of the tree. Returns the number
+    of folders removed."""
+    root = os.path.normcase(os.path.abspath(root))
+    by_depth = {}
+    for folder in folders:
+        folder = os.path.abspath(folder)
+        by_depth.setdefault(folder.count(os.sep), set()).add(folder)
+    removed = 0
+    while by_depth:
+        depth = max(by_depth)
+        for folder in sorted(by_depth.pop(depth)):
+            if os.path.normcase(folder) == root:
+                continue
+            try:
+                os.rmdir(folder)
+            except OSError:
+                continue  # not empty (or already gone)
+            removed += 1
+            print(f"Removed empty folder: {project_path(Path(folder))}")
+            logger.info(f"Removed empty folder: {project_path(Path(folder))}")
+            parent = os.path.dirname(folder)
+            if os.path.normcase(parent).startswith(root + os.sep):
+                by_depth.setdefault(depth - 1, set()).add(parent)
+    return removed
+
 def remove_empty_folders(folder: Path):
-    """Recursively remove empty subfolders."""
+    """Recursively remove empty subfolders (full scan, see --sweep-empty)."""
     if not folder.exists():
         return
     for subfolder in folder.iterdir():
@@ -161,35 +1314,116 @@ def remove_empty_folders(folder: Path):
 
 
 # --- Undo last cleanup ---
-def undo_cleanup(dry_run=False):
-    if not UNDO_LOG_PATH.exists():
+def list_runs():
+    """Print the recorded cleanup runs, newest first."""
+    conn = open_journal()
+    try:
+        runs = conn.execute("SELECT id, started, status, files, mode, source FROM runs ORDER BY id DESC").fetchall()
+    finally:
+        conn.close()
+    if not runs:
+        print("No undo history found.")
+    for run_id, started, status, files, mode, source in runs:
+        print(f"Run {run_id} | {started} | {status} | {files} files | {mode or '-'} | {source or '-'}")
+
+def undo_cleanup(dry_run=False, run_id=None, workers=1, emptied=None):
+    """Move the files of one run back to where they came from: run_id, or
+    the last run that was not undone yet. Returns the number of files.
+    The folders files were moved out of are added to the emptied set.
+
+    Moves are replayed newest first, on `workers` threads grouped by the
+    folder they return to; each worker creates its folders once. An
+    interrupted undo can simply be run again: files that are already back
+    are skipped. A run whose files could not all go back (their original
+    path is taken again) is not marked undone, so it can be replayed.
+    """
+    if not UNDO_DB_PATH.exists() and not UNDO_LOG_PATH.exists():
         print("No undo history found.")
         logger.info("Undo attempted but no history found.")
-        return
+        return 0
 
-    with open(UNDO_LOG_PATH, "r") as f:
-        lines = [line.strip() for line in f.readlines()]
+    conn = open_journal()
+    try:
+        if run_id is None:
+            row = conn.execute("SELECT id FROM runs WHERE status != 'undone' ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = conn.execute("SELECT id FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            print("No undo history found." if run_id is None else f"Run {run_id} not found.")
+            logger.info("Undo attempted but no history found.")
+            return 0
+        run_id = row[0]
 
-    for line in reversed(lines):  # reverse order to prevent conflicts
-        target_str, original_str = line.split("|")
-        target_path = Path(target_str)
-        original_path = Path(original_str)
+        files = 0
+        skipped = 0
+        created = set()  # folders are only added by the worker that owns them
+        count_lock = threading.Lock()
 
-        if target_path.exists() or dry_run:
+        def undo(move):
+            nonlocal files, skipped
+            target_path, original_path = Path(move[0]), Path(move[1])
             if not dry_run:
-                original_path.parent.mkdir(parents=True, exist_ok=True)
-                shutil.move(str(target_path), str(original_path))
-            print(f"{'[DRY-RUN] ' if dry_run else 'Undo: '} {project_path(target_path)} -> {project_path(original_path)}")
-            logger.info(f"{'DRY-RUN: ' if dry_run else 'Undo: '} {project_path(target_path)} -> {project_path(original_path)}")
+                if os.path.lexists(original_path):
+                    if os.path.lexists(target_path):
+                        print(f"Skipped: {project_path(original_path)} exists again")
+                        logger.warning(f"Undo skipped, {project_path(original_path)} exists again")
+                        with count_lock:
+                            skipped += 1
+                    return  # otherwise already undone, or the run stopped before moving it
+                if original_path.parent not in created:
+                    original_path.parent.mkdir(parents=True, exist_ok=True)
+                    created.add(original_path.parent)
+                try:
+                    relocate(target_path, original_path)
+                except FileNotFoundError:
+                    return  # moved or deleted since the run
+            with count_lock:
+                files += 1
+                if emptied is not None and not dry_run:
+                    emptied.add(target_path.parent)
+            shown = f"{project_path(target_path)} -> {project_path(original_path)}"
+            with _print_lock:
+                print(f"{'[DRY-RUN] ' if dry_run else 'Undo: '} {shown}")
+            logger.info(f"{'DRY-RUN: ' if dry_run else 'Undo: '} {shown}")
+
+        # Newest first, streamed from the database
+        moves = conn.execute("SELECT target, original FROM moves WHERE run = ? ORDER BY seq DESC", (run_id,))
+        run_in_lanes(moves, lambda move: os.path.dirname(move[1]), undo, workers)
 
-    if not dry_run and UNDO_LOG_PATH.exists():
-        UNDO_LOG_PATH.unlink()
-        print("Undo completed.")
-        logger.info("Undo completed and log cleared.")
+        if skipped:
+            print(f"Undo of run {run_id} skipped {skipped} files; free their paths and run it again.")
+            logger.warning(f"Undo of run {run_id} skipped {skipped} files, run left open for replay.")
+        elif not dry_run:
+            with conn:
+                conn.execute("UPDATE runs SET status = 'undone' WHERE id = ?", (run_id,))
+            print(f"Undo of run {run_id} completed.")
+            logger.info(f"Undo of run {run_id} completed.")
+        return files
+    finally:
+        conn.close()
 
 # --- Main ---
 def main():
     args = get_args()
+    profiler = Profiler("auto_cleanup", unit="files")
+    if args.profile_dump:
+        profiler.start_dump(args.profile_dump)
+    try:
+        run(args, profiler)
+    finally:
+        if args.profile:
+            profiler.write(args.profile)
+        profiler.stop_dump()
+
+def sweep_empty_folders(args, source, profiler):
+    """--sweep-empty: remove every empty folder under source."""
+    if args.sweep_empty and not (args.dry_run or args.plan) and source.exists():
+        with profiler.stage("remove_empty_folders"):
+            remove_empty_folders(source)
+
+def run(args, profiler):
+    global VERIFY_COPIES
+    VERIFY_COPIES = args.verify
 
     # Resolve absolute paths
     source = (Path(args.source) if Path(args.source).is_absolute() else SCRIPT_DIR / args.source).resolve()
@@ -197,14 +1431,35 @@ def main():
 
     # Reset
     if args.reset:
-        reset_folder(source)
+        with profiler.stage("reset"):
+            reset_folder(source)
+        return
+
+    # History
+    if args.history:
+        list_runs()
         return
 
     # Undo
     if args.undo:
-        undo_cleanup(dry_run=args.dry_run)
-        if source.exists:
-            remove_empty_folders(source)
+        emptied = set()
+        with profiler.stage("undo") as stage:
+            stage["files"] += undo_cleanup(dry_run=args.dry_run, run_id=args.run, workers=args.workers,
+                                           emptied=emptied)
+        with profiler.stage("prune_empty_folders"):
+            prune_empty_folders(emptied, source)
+        sweep_empty_folders(args, source, profiler)
+        return
+
+    # Apply a saved plan
+    if args.apply:
+        plan = load_plan(args.apply)
+        if Path(plan["source"]) != source:
+            print(f"Error: '{args.apply}' was planned for '{plan['source']}', not '{source}'")
+            return
+        with profiler.stage("apply") as stage:
+            stage["files"] += apply_plan(plan, dry_run=args.dry_run, workers=args.workers)
+        sweep_empty_folders(args, source, profiler)
         return
 
     # Validate folder
@@ -212,13 +1467,68 @@ def main():
         print(f"Error: '{source}' is not a valid folder")
         return
 
+    # Rule file
+    rules = None
+    if args.rules:
+        try:
+            rules = RuleSet.load(args.rules)
+        except (OSError, ValueError, re.error) as e:
+            print(f"Error: invalid rules file '{args.rules}': {e}")
+            return
+
+    # Duplicates go here, and sorting never looks inside it
+    quarantine = (Path(args.quarantine).resolve() if args.quarantine
+                  else destination / DUPLICATES_FOLDER)
+
+    # Watch
+    if args.watch:
+        with profiler.stage("watch") as stage:
+            stage["files"] += watch(source, destination, args.mode, dry_run=args.dry_run, workers=args.workers,
+                                    recursive=args.recursive, max_depth=args.max_depth,
+                                    debounce=args.debounce, skip=[quarantine], rules=rules)
+        if rules is not None:
+            rules.report(profiler)
+        return
+
     logger.info(f"Started cleanup | mode={args.mode} | dry_run={args.dry_run} | source={source}")
 
     # Perform cleanup
-    if args.mode == "extension":
-        organize_by_extension(source, destination, dry_run=args.dry_run)
-    else:
-        organize_by_date(source, destination, dry_run=args.dry_run)
+    dedup = args.dedup or args.mode == "dedup"
+    sort = "rules" if rules is not None else args.mode if args.mode != "dedup" else None
+    modes = "+".join((["dedup"] if dedup else []) + ([sort] if sort else []))
+    plan = MovePlan() if args.plan else None
+    quarantined = set()
+    with UndoJournal(source=source, mode=modes) as journal:
+        if dedup:
+            with profiler.stage("quarantine_duplicates") as stage:
+                files, size = quarantine_duplicates(source, quarantine, dry_run=args.dry_run, workers=args.workers,
+                                                    recursive=args.recursive, max_depth=args.max_depth,
+                                                    journal=journal, plan=plan, quarantined=quarantined,
+                                                    skip=[destination] if destination != source else [])
+                stage["files"] += files
+                stage["bytes_written"] += 0 if args.dry_run or args.plan else size
+
+        if sort:
+            folder_for = rules or (extension_folder if sort == "extension" else date_folder)
+            with profiler.stage(f"organize_by_{sort}") as stage:
+                files, size = organize(source, destination, folder_for, dry_run=args.dry_run,
+                                       workers=args.workers, recursive=args.recursive,
+                                       max_depth=args.max_depth, measure_bytes=bool(args.profile),
+                                       journal=journal, skip=[quarantine], plan=plan, exclude=quarantined)
+                stage["files"] += files
+                stage["bytes_written"] += 0 if args.dry_run or args.plan else size
+    if rules is not None:
+        rules.report(profiler)
+    if journal.run_id is not None:
+        print(f"Recorded as run {journal.run_id} (undo with --undo --run {journal.run_id})")
+    # Subfolders that --recursive moved everything out of
+    with profiler.stage("prune_empty_folders"):
+        prune_empty_folders(journal.folders, source)
+    sweep_empty_folders(args, source, profiler)
+    if plan is not None:
+        plan.save(args.plan, source=str(source), destination=str(destination), mode=modes)
+        print(f"Planned {len(plan.moves)} moves into {len(plan.folders)} folders: {args.plan}")
+        logger.info(f"Saved plan of {len(plan.moves)} moves to {args.plan}")
 
     logger.info("Cleanup completed")
 
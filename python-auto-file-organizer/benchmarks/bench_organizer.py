@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the auto file organizer.
+
+Subcommands:
+  generate  Write a deterministic synthetic folder tree (file count,
+            name-collision rate, extension spread, mtime spread and
+            depth are configurable).
+  run       Time organize_by_extension, organize_by_date, undo_cleanup,
+            remove_empty_folders and prune_empty_folders end to end on
+            fresh synthetic trees, count the file-system calls each one
+            makes per file and store the results as a JSON baseline.
+  compare   Compare two result files and exit with status 1 when a case
+            got slower or makes more file-system calls than allowed.
+
+Examples:
+  python3 benchmarks/bench_organizer.py generate /tmp/synthetic-tree --files 1e5 --depth 3
+  python3 benchmarks/bench_organizer.py run --files 1e4 --out benchmarks/results/current.json
+  python3 benchmarks/bench_organizer.py compare benchmarks/results/baseline.json benchmarks/results/current.json
+
+The benchmarks never touch logs/undo.db or the log file: the undo journal
+and the log are redirected into a temporary work folder.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project folder to Python path so imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.join(current_dir, "..")
+sys.path.insert(0, project_dir)
+
+import auto_cleanup  # noqa: E402
+
+CASES = ["organize_by_extension", "organize_by_date", "undo_cleanup",
+         "remove_empty_folders", "prune_empty_folders"]
+
+# Common extensions first; --extensions beyond this list get made-up ones
+EXTENSIONS = ["jpg", "png", "pdf", "txt", "docx", "xlsx", "csv", "mp4",
+              "mp3", "zip", "py", "md", "json", "html", "gif", "heic"]
+
+# Subfolders per folder in generated trees
+FANOUT = 4
+
+# Newest mtime in generated trees (fixed so date folders do not depend on the day)
+BASE_MTIME = 1_700_000_000
+
+# Audit events (sys.addaudithook) that are file-system calls. stat() and
+# lstat() raise no audit event, so they are counted by wrapping os.stat
+# and os.lstat instead.
+FS_EVENTS = {"open", "os.rename", "os.remove", "os.mkdir", "os.rmdir", "os.scandir",
+             "os.listdir", "os.truncate", "os.utime", "os.chmod", "os.link",
+             "os.symlink", "shutil.copyfile", "shutil.rmtree"}
+
+
+# -----------------------
+# Synthetic trees
+# -----------------------
+def tree_folders(depth, fanout=FANOUT):
+    """Relative folder paths of a tree `depth` levels deep, root ("") first."""
+    folders, level = [""], [""]
+    for d in range(depth):
+        level = [os.path.join(parent, f"dir{d}_{i}") for parent in level for i in range(fanout)]
+        folders.extend(level)
+    return folders
+
+
+def generate_tree(root, files=10_000, collision_rate=0.1, extensions=8, mtime_days=365,
+                  depth=2, file_size=0, seed=0):
+    """Write `files` files spread over a tree `depth` folders deep under root.
+
+    Extensions follow a Zipf-like spread over `extensions` kinds, mtimes are
+    spread over `mtime_days` days before BASE_MTIME, and about collision_rate
+    of the files reuse the name of an earlier file in another folder, so
+    organizing them has to pick suffixed names (name_1.ext). The same
+    arguments always give the same tree. Returns the folders (Paths) of the tree.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    folders = tree_folders(depth)
+    for folder in folders:
+        (root / folder).mkdir(parents=True, exist_ok=True)
+
+    kinds = [EXTENSIONS[k] if k < len(EXTENSIONS) else f"ext{k}" for k in range(extensions)]
+    weights = [1 / (k + 1) for k in range(extensions)]
+    content = b"x" * file_size
+    names, taken = [], set()
+    for i in range(files):
+        folder = rng.choice(folders)
+        name = None
+        if names and rng.random() < collision_rate:
+            name = rng.choice(names)
+        if name is None or (folder, name) in taken:
+            name = f"file{i:07d}.{rng.choices(kinds, weights)[0]}"
+            names.append(name)
+        taken.add((folder, name))
+
+        path = root / folder / name
+        with open(path, "wb") as f:
+            f.write(content)
+        mtime = BASE_MTIME - rng.random() * mtime_days * 86400
+        os.utime(path, (mtime, mtime))
+    return [root / folder for folder in folders]
+
+
+# -----------------------
+# Measurements
+# -----------------------
+class CallCounter:
+    """Count the file-system calls made from Python while active: audited
+    events (open, rename, scandir, mkdir, ...) plus os.stat/os.lstat. Calls
+    the C code makes on its own (DirEntry.stat(), SQLite's journal I/O) are
+    not included, so the numbers are for comparing runs, not an strace."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.active = False
+        self._lock = threading.Lock()
+        self._hooked = False
+
+    def _count(self, event):
+        with self._lock:
+            self.calls[event] += 1
+
+    def _audit(self, event, args):
+        if self.active and event in FS_EVENTS:
+            self._count(event)
+
+    def _wrap(self, name):
+        func = getattr(os, name)
+
+        def counted(*args, **kwargs):
+            if self.active:
+                self._count(f"os.{name}")
+            return func(*args, **kwargs)
+        return func, counted
+
+    @contextlib.contextmanager
+    def counting(self):
+        """Count the calls made inside the block (audit hooks cannot be
+        removed, so the hook is installed once and switched on and off)."""
+        if not self._hooked:
+            sys.addaudithook(self._audit)
+            self._hooked = True
+        wrapped = {name: self._wrap(name) for name in ("stat", "lstat")}
+        for name, (_, counted) in wrapped.items():
+            setattr(os, name, counted)
+        self.calls.clear()
+        self.active = True
+        try:
+            yield self.calls
+        finally:
+            self.active = False
+            for name, (func, _) in wrapped.items():
+                setattr(os, name, func)
+
+
+def isolate(work_dir):
+    """Point the undo journal and the log at work_dir instead of logs/."""
+    auto_cleanup.UNDO_DB_PATH = Path(work_dir) / "undo.db"
+    auto_cleanup.UNDO_LOG_PATH = Path(work_dir) / "undo.log"
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
+    root_logger.addHandler(logging.FileHandler(Path(work_dir) / "auto_cleanup.log"))
+
+
+def prepare(case, root, config, workers=1):
+    """Build a fresh tree (and journal) for one run of `case` and return the
+    call to time. undo_cleanup and the folder cleanups start from a tree that
+    was organized by extension; that setup is not timed."""
+    for path in auto_cleanup.UNDO_DB_PATH.parent.glob(auto_cleanup.UNDO_DB_PATH.name + "*"):
+        path.unlink()
+    folders = generate_tree(root, **config)
+    recursive = config["depth"] > 0
+    if case == "organize_by_extension":
+        return lambda: auto_cleanup.organize_by_extension(root, root, workers=workers, recursive=recursive)
+    if case == "organize_by_date":
+        return lambda: auto_cleanup.organize_by_date(root, root, workers=workers, recursive=recursive)
+
+    auto_cleanup.organize_by_extension(root, root, workers=workers, recursive=recursive)
+    if case == "undo_cleanup":
+        return lambda: auto_cleanup.undo_cleanup(workers=workers)
+    if case == "remove_empty_folders":
+        return lambda: auto_cleanup.remove_empty_folders(root)
+    return lambda: auto_cleanup.prune_empty_folders(folders, root)
+
+
+def measure(case, root, config, workers=1, repeat=3, counter=None):
+    """Best wall time over `repeat` runs on fresh trees, plus the file-system
+    calls of one more run counted by counter."""
+    best = float("inf")
+    for _ in range(repeat):
+        func = prepare(case, root, config, workers)
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+        shutil.rmtree(root)
+
+    func = prepare(case, root, config, workers)
+    with counter.counting() as calls:
+        func()
+    shutil.rmtree(root)
+    total = sum(calls.values())
+    files = config["files"]
+    return {
+        "seconds": best,
+        "files_per_second": files / best if best > 0 else None,
+        "fs_calls": total,
+        "fs_calls_per_file": total / files if files else 0.0,
+        "calls": dict(sorted(calls.items())),
+    }
+
+
+def run_benchmarks(config, work_dir, workers=1, repeat=3, cases=CASES):
+    """Run each case on trees under work_dir. The organizer's per-file output
+    is discarded."""
+    isolate(work_dir)
+    root = Path(work_dir).resolve() / "tree"
+    counter = CallCounter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return {case: measure(case, root, config, workers, repeat, counter) for case in cases}
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "organizer": auto_cleanup.VERSION,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare_results(baseline, current, time_tolerance=0.25, calls_tolerance=0.05):
+    """Return a list of regression messages (empty when everything is within tolerance)."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if now is None:
+            regressions.append(f"{name}: missing from current results")
+            continue
+        if now["seconds"] > base["seconds"] * (1 + time_tolerance):
+            regressions.append(f"{name}: {base['seconds']:.4f}s -> {now['seconds']:.4f}s")
+        if now["fs_calls_per_file"] > base["fs_calls_per_file"] * (1 + calls_tolerance):
+            regressions.append(f"{name}: {base['fs_calls_per_file']:.2f} -> "
+                               f"{now['fs_calls_per_file']:.2f} file-system calls per file")
+    return regressions
+
+
+# -----------------------
+# CLI Wrapper
+# -----------------------
+def add_tree_arguments(parser):
+    parser.add_argument("--files", type=float, default=1e4, help="Number of files (1e3 - 1e6)")
+    parser.add_argument("--collision-rate", type=float, default=0.1,
+                        help="Share of files that reuse a name from another folder")
+    parser.add_argument("--extensions", type=int, default=8, help="Number of distinct extensions")
+    parser.add_argument("--mtime-days", type=float, default=365, help="Days the modification times spread over")
+    parser.add_argument("--depth", type=int, default=2, help="Folder levels below the root")
+    parser.add_argument("--file-size", type=int, default=0, help="Bytes per file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def tree_config(parser, args):
+    if args.files < 1 or args.extensions < 1 or args.depth < 0 or args.file_size < 0 or args.mtime_days < 0:
+        parser.error("--files and --extensions must be at least 1; --depth, --file-size "
+                     "and --mtime-days cannot be negative")
+    if not 0 <= args.collision_rate <= 1:
+        parser.error("--collision-rate must be between 0 and 1")
+    if args.collision_rate > 0 and args.depth == 0:
+        parser.error("--collision-rate needs --depth of at least 1 (names collide across folders)")
+    return {
+        "files": int(args.files),
+        "collision_rate": args.collision_rate,
+        "extensions": args.extensions,
+        "mtime_days": args.mtime_days,
+        "depth": args.depth,
+        "file_size": args.file_size,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the auto file organizer")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a synthetic folder tree")
+    generate.add_argument("path", help="Folder to create the tree in")
+    add_tree_arguments(generate)
+
+    run = commands.add_parser("run", help="Benchmark each organizer function")
+    add_tree_arguments(run)
+    run.add_argument("--cases", nargs="+", choices=CASES, default=CASES, help="Cases to run (default: all)")
+    run.add_argument("-w", "--workers", type=int, default=1, help="Worker threads for moves")
+    run.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    run.add_argument("--out", help="Write results as JSON to this path")
+
+    compare = commands.add_parser("compare", help="Fail on regressions against a baseline")
+    compare.add_argument("baseline", help="Baseline results JSON")
+    compare.add_argument("current", help="Current results JSON")
+    compare.add_argument("--time-tolerance", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    compare.add_argument("--calls-tolerance", type=float, default=0.05,
+                         help="Allowed growth of file-system calls per file")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        config = tree_config(generate, args)
+        if Path(args.path).exists() and any(Path(args.path).iterdir()):
+            generate.error(f"'{args.path}' is not empty")
+        generate_tree(args.path, **config)
+        print(f"Synthetic tree saved to: {args.path}")
+        return
+
+    if args.command == "run":
+        config = tree_config(run, args)
+        if args.workers < 1 or args.repeat < 1:
+            run.error("--workers and --repeat must be at least 1")
+        with tempfile.TemporaryDirectory(prefix="organizer-bench-") as work_dir:
+            results = run_benchmarks(config, work_dir, args.workers, args.repeat, args.cases)
+            logging.shutdown()
+
+        report = {"config": {**config, "workers": args.workers}, "environment": environment(), "results": results}
+        for name, result in results.items():
+            rate = result["files_per_second"]
+            print(f"{name:<24}{result['seconds']:>10.4f}s{rate or 0:>12.0f} files/s"
+                  f"{result['fs_calls_per_file']:>8.2f} calls/file")
+        if args.out:
+            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults saved to: {args.out}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline.get("config") != current.get("config"):
+        print("Warning: baseline and current results were produced with different tree configs")
+
+    regressions = compare_results(baseline, current, args.time_tolerance, args.calls_tolerance)
+    if regressions:
+        print("Regressions:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("No regressions.")
+
+
+# -----------------------
+# Entry point
+# -----------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Generated from csv-cleaner/src/instrumentation.py by sync_instrumentation.py.
+# Do not edit: change the source and run the script again.
+"""
+Run instrumentation shared by csv-cleaner and the auto file organizer.
+
+A Profiler times named stages and counts the items (rows or files) and
+bytes each one handled. Its report is plain JSON: per-stage wall time,
+items per second and bytes read/written, plus total wall time and the
+process's peak RSS. start_dump() adds a cProfile dump (.prof, for pstats
+or snakeviz), or a pyinstrument HTML report when the path ends in .html.
+
+The module only uses the standard library, so the tools can import it at
+startup. This file is the only source: the auto file organizer ships a
+copy generated by its sync_instrumentation.py, which CI checks is current.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process in bytes, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return _windows_peak_rss()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _windows_peak_rss():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def file_size(path):
+    """Size of a file in bytes, 0 when it does not exist (or is stdin/stdout)."""
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+class Profiler:
+    """Collect per-stage timings and counters for one run of a tool.
+
+    tool: name written to the report.
+    unit: what items are ("rows", "files"), used for the rate field name.
+    """
+
+    def __init__(self, tool, unit="rows"):
+        self.tool = tool
+        self.unit = unit
+        self.stages = {}
+        self._started = time.perf_counter()
+        self._dump = None
+
+    def _entry(self, name):
+        return self.stages.setdefault(name, {"seconds": 0.0, "calls": 0, self.unit: 0,
+                                             "bytes_read": 0, "bytes_written": 0})
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block as stage `name`. The yielded dict takes counters, e.g.
+        entry["rows"] += n or entry["bytes_written"] += size."""
+        entry = self._entry(name)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] += time.perf_counter() - start
+            entry["calls"] += 1
+
+    def add(self, name, seconds=0.0, items=0, bytes_read=0, bytes_written=0, calls=1):
+        """Record work that was timed elsewhere (e.g. a pipeline's own report)."""
+        entry = self._entry(name)
+        entry["seconds"] += seconds
+        entry["calls"] += calls
+        entry[self.unit] += items
+        entry["bytes_read"] += bytes_read
+        entry["bytes_written"] += bytes_written
+
+    def start_dump(self, path):
+        """Profile the rest of the run with cProfile, or pyinstrument for .html."""
+        if path.endswith(".html"):
+            try:
+                from pyinstrument import Profiler as Sampler
+            except ImportError:
+                raise RuntimeError("HTML profiles require pyinstrument: pip install pyinstrument") from None
+            sampler = Sampler()
+            sampler.start()
+            self._dump = (path, sampler)
+        else:
+            import cProfile
+            profile = cProfile.Profile()
+            profile.enable()
+            self._dump = (path, profile)
+
+    def stop_dump(self):
+        if self._dump is None:
+            return
+        path, profiler = self._dump
+        self._dump = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".html"):
+            profiler.stop()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        else:
+            profiler.disable()
+            profiler.dump_stats(path)
+
+    def report(self):
+        rate = f"{self.unit}_per_second"
+        stages = {}
+        for name, entry in self.stages.items():
+            stage = dict(entry)
+            stage[rate] = entry[self.unit] / entry["seconds"] if entry["seconds"] > 0 else None
+            stages[name] = stage
+        return {
+            "tool": self.tool,
+            "wall_seconds": time.perf_counter() - self._started,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "bytes_read": sum(entry["bytes_read"] for entry in self.stages.values()),
+            "bytes_written": sum(entry["bytes_written"] for entry in self.stages.values()),
+            "stages": stages,
+        }
+
+    def write(self, path):
+        """Write the JSON report to path, or to stderr for "-"."""
+        self.stop_dump()
+        text = json.dumps(self.report(), indent=2)
+        if path == "-":
+            sys.stderr.write(text + "\n")
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Copy csv-cleaner's instrumentation.py into the organizer.
+
+csv-cleaner/src/instrumentation.py is the only source of the Profiler.
+auto_cleanup.py is a standalone script that cannot import from another
+project, so it ships a generated copy next to it. Run this after editing
+the source; CI runs it with --check and fails when the copy is stale.
+
+Examples:
+  python3 python-auto-file-organizer/sync_instrumentation.py
+  python3 python-auto-file-organizer/sync_instrumentation.py --check
+"""
+import argparse
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+SOURCE = SCRIPT_DIR.parent / "csv-cleaner" / "src" / "instrumentation.py"
+COPY = SCRIPT_DIR / "instrumentation.py"
+BANNER = ("# Generated from csv-cleaner/src/instrumentation.py by sync_instrumentation.py.\n"
+          "# Do not edit: change the source and run the script again.\n")
+
+
+def expected_copy():
+    return BANNER + SOURCE.read_text(encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy csv-cleaner's instrumentation.py into the organizer")
+    parser.add_argument("--check", action="store_true", help="Only check that the copy is up to date")
+    args = parser.parse_args()
+
+    expected = expected_copy()
+    # Text mode on both sides, so line endings from a Windows checkout do not count
+    current = COPY.read_text(encoding="utf-8") if COPY.exists() else None
+    if args.check:
+        if current != expected:
+            sys.exit(f"{COPY} is out of date; run {Path(__file__).name} to copy {SOURCE}")
+        print(f"{COPY.name} is up to date")
+        return
+    if current != expected:
+        with open(COPY, "w", encoding="utf-8", newline="\n") as f:
+            f.write(expected)
+        print(f"Updated {COPY}")
+    else:
+        print(f"{COPY.name} is already up to date")
+
+
+if __name__ == "__main__":
+    main()
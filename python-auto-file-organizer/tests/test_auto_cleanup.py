@@ -0,0 +1,363 @@
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the project folder to Python path so auto_cleanup imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, ".."))
+
+import auto_cleanup as ac  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def journal_paths(tmp_path, monkeypatch):
+    """Keep the undo history of every test in its own folder."""
+    monkeypatch.setattr(ac, "UNDO_DB_PATH", tmp_path / "undo.db")
+    monkeypatch.setattr(ac, "UNDO_LOG_PATH", tmp_path / "undo.log")
+
+
+@pytest.fixture
+def source(tmp_path):
+    folder = tmp_path / "source"
+    folder.mkdir()
+    return folder
+
+
+def make_files(folder, names, content=None):
+    for name in names:
+        path = folder / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content if content is not None else name)
+    return [folder / name for name in names]
+
+
+def runs():
+    conn = sqlite3.connect(ac.UNDO_DB_PATH)
+    try:
+        return conn.execute("SELECT id, status, files FROM runs ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def run_cli(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["auto_cleanup.py", *map(str, args)])
+    ac.main()
+
+
+# --- Undo journal ---
+def test_journal_records_moves_before_a_crash(source):
+    files = make_files(source, ["a.txt", "b.txt", "c.txt"])
+    target = source / "txt"
+    target.mkdir()
+    with pytest.raises(KeyboardInterrupt):
+        with ac.UndoJournal(source=source, mode="extension") as journal:
+            journal.record((target / f.name, f) for f in files)
+            os.rename(files[0], target / "a.txt")  # killed after the first move
+            raise KeyboardInterrupt
+    assert runs() == [(1, "interrupted", 3)]
+
+    assert ac.undo_cleanup() == 1
+    assert sorted(p.name for p in source.iterdir() if p.is_file()) == ["a.txt", "b.txt", "c.txt"]
+    assert runs()[0][1] == "undone"
+
+
+def test_undo_can_be_replayed(source):
+    make_files(source, ["a.txt", "b.txt", "c.jpg"])
+    ac.organize_by_extension(source, source)
+    os.rename(source / "txt" / "a.txt", source / "a.txt")  # an earlier undo stopped here
+
+    assert ac.undo_cleanup(workers=2) == 2
+    assert sorted(p.name for p in source.iterdir() if p.is_file()) == ["a.txt", "b.txt", "c.jpg"]
+    assert ac.undo_cleanup() == 0  # nothing left to undo
+
+
+def test_undo_keeps_run_open_when_files_are_skipped(source):
+    make_files(source, ["a.txt", "b.txt"])
+    ac.organize_by_extension(source, source)
+    (source / "a.txt").write_text("new file with the old name")
+
+    assert ac.undo_cleanup() == 1
+    assert (source / "a.txt").read_text() == "new file with the old name"
+    assert runs()[0][1] == "complete"
+
+    (source / "a.txt").unlink()
+    assert ac.undo_cleanup() == 1
+    assert (source / "a.txt").read_text() == "a.txt"
+    assert runs()[0][1] == "undone"
+
+
+def test_old_undo_log_is_imported(source):
+    moved = make_files(source / "txt", ["a.txt"])[0]
+    ac.UNDO_LOG_PATH.write_text(f"{moved}|{source / 'a.txt'}\n")
+
+    assert ac.undo_cleanup() == 1
+    assert (source / "a.txt").exists()
+    assert not ac.UNDO_LOG_PATH.exists()
+
+
+# --- Target names ---
+def test_target_names_number_clashes(tmp_path):
+    make_files(tmp_path, ["report.txt", "report_1.txt"])
+    names = ac.TargetNames()
+    reserved = [names.reserve(tmp_path, "report.txt").name for _ in range(3)]
+    assert reserved == ["report_2.txt", "report_3.txt", "report_4.txt"]
+
+
+def test_same_names_across_worker_lanes(source):
+    # 20 folders of files with the same 5 names, sorted into 2 folders by 4 workers
+    for folder in range(20):
+        make_files(source / f"in{folder}", [f"file{i}.{'txt' if i % 2 else 'log'}" for i in range(5)],
+                   content=f"{folder}")
+    files, _ = ac.organize(source, source, ac.extension_folder, workers=4, recursive=True)
+
+    assert files == 100
+    moved = [p for p in source.rglob("*") if p.is_file()]
+    assert len(moved) == 100
+    assert {p.parent.name for p in moved} == {"txt", "log"}
+    assert len({p.name for p in moved if p.parent.name == "txt"}) == 40
+    # Every file kept its content: one copy per source folder for each name
+    for name in ("file0", "file1"):
+        contents = sorted(p.read_text() for p in moved if p.stem.split("_")[0] == name)
+        assert contents == sorted(str(folder) for folder in range(20))
+
+
+# --- Duplicates ---
+def duplicate_groups(folder, workers=1, block=ac.DEDUP_BLOCK):
+    groups = ac.find_duplicates(ac.scan_files(folder), workers, block)
+    return sorted(sorted(Path(path).name for path in group) for group in groups)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_find_duplicates_by_size_edges_and_content(source, workers, monkeypatch):
+    monkeypatch.setattr(ac, "HASH_SLICE", 64)  # several slices per full hash
+    block = 16
+    small, large = b"a" * 2 * block, bytes(range(256)) * 4  # at and above the full-hash threshold
+    middle = bytearray(large)
+    middle[len(large) // 2] ^= 1  # same first and last block, different middle
+    for name, data in [("small1", small), ("small2", small), ("small_other", b"b" * 2 * block),
+                       ("large1", large), ("large2", large), ("large_middle", middle),
+                       ("empty1", b""), ("empty2", b""), ("unique", b"xyz")]:
+        (source / name).write_bytes(data)
+
+    assert duplicate_groups(source, workers, block) == [["large1", "large2"], ["small1", "small2"]]
+
+
+def test_find_duplicates_keeps_the_oldest(source):
+    files = make_files(source, ["new.txt", "old.txt", "mid.txt"], content="same")
+    for age, path in zip((0, 200, 100), files):
+        os.utime(path, (1_000_000 - age, 1_000_000 - age))
+    groups = ac.find_duplicates(ac.scan_files(source))
+    assert [[Path(path).name for path in group] for group in groups] == [["old.txt", "mid.txt", "new.txt"]]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or sys.platform == "win32", reason="needs symlinks")
+def test_find_duplicates_skips_links(source):
+    original = make_files(source, ["a.txt"], content="same")[0]
+    os.symlink(original, source / "link.txt")
+    os.link(original, source / "hard.txt")
+    assert duplicate_groups(source) == []
+    make_files(source, ["copy.txt"], content="same")
+    assert len(duplicate_groups(source)[0]) == 2  # the copy and one name of the hard-linked file
+
+
+# --- Watch mode ---
+def watch_briefly(source, actions, stop_after, **options):
+    """Run watch() until SIGTERM, doing actions (delay, function) meanwhile."""
+    timers = [threading.Timer(delay, action) for delay, action in actions]
+    timers.append(threading.Timer(stop_after, os.kill, (os.getpid(), signal.SIGTERM)))
+    for timer in timers:
+        timer.start()
+    try:
+        return ac.watch(source, source, **options)
+    finally:
+        for timer in timers:
+            timer.cancel()
+
+
+def write_old(path, text="old"):
+    path.write_text(text)
+    os.utime(path, (1_000_000, 1_000_000))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+def test_watch_moves_new_files(source):
+    write_old(source / "before.txt")
+    (source / "sub").mkdir()
+
+    files = watch_briefly(source, [(0.3, lambda: (source / "new.jpg").write_text("new")),
+                                   (0.3, lambda: (source / "sub" / "deep.txt").write_text("deep"))],
+                          stop_after=1.5, debounce=0.3, recursive=True)
+
+    assert files == 3
+    assert sorted(p.relative_to(source).as_posix() for p in source.rglob("*") if p.is_file()) == [
+        "jpg/new.jpg", "txt/before.txt", "txt/deep.txt"]
+    assert ac.undo_cleanup() == 3  # the session is one undo run
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="stopped with SIGTERM")
+def test_watch_polls_without_inotify(source, monkeypatch):
+    def no_inotify():
+        raise OSError("not here")
+
+    monkeypatch.setattr(ac, "Inotify", no_inotify)
+    write_old(source / "before.txt")
+    files = watch_briefly(source, [(0.3, lambda: write_old(source / "later.pdf"))],
+                          stop_after=1.8, debounce=0.2)
+
+    assert files == 2
+    assert (source / "txt" / "before.txt").exists() and (source / "pdf" / "later.pdf").exists()
+
+
+# --- Plans ---
+def test_plan_then_apply(tmp_path, source, monkeypatch):
+    make_files(source, ["a.txt", "b.jpg", "txt/a.txt"])
+    plan_path = tmp_path / "plan.json"
+
+    run_cli(monkeypatch, "-s", source, "--plan", plan_path)
+    assert (source / "a.txt").exists()  # planning moves nothing
+    plan = json.loads(plan_path.read_text())
+    assert plan["files"] == 2
+    assert sorted(Path(target).name for _, target in plan["moves"]) == ["a_1.txt", "b.jpg"]
+
+    run_cli(monkeypatch, "-s", source, "--apply", plan_path)
+    assert sorted(p.relative_to(source).as_posix() for p in source.rglob("*") if p.is_file()) == [
+        "jpg/b.jpg", "txt/a.txt", "txt/a_1.txt"]
+
+    run_cli(monkeypatch, "-s", source, "--undo")
+    assert (source / "a.txt").exists() and (source / "b.jpg").exists()
+
+
+def test_apply_skips_files_that_changed(tmp_path, source, monkeypatch):
+    make_files(source, ["a.txt", "b.txt"])
+    plan_path = tmp_path / "plan.json"
+    run_cli(monkeypatch, "-s", source, "--plan", plan_path)
+    (source / "a.txt").unlink()
+    make_files(source / "txt", ["b.txt"])  # someone took the planned name
+
+    assert ac.apply_plan(ac.load_plan(plan_path)) == 0
+    assert (source / "b.txt").exists()
+
+
+# --- Rules ---
+def test_rules_first_match_wins(tmp_path):
+    make_files(tmp_path, ["photo.JPG", "notes.txt", "report-2024.pdf", "data.bin"])
+    (tmp_path / "big.bin").write_bytes(b"x" * 2048)
+    rules = ac.RuleSet([
+        {"name": "photos", "extensions": ["jpg", ".png"], "folder": "Photos"},
+        {"name": "reports", "glob": "report-*", "folder": "Reports/{ext}"},
+        {"name": "big", "min_size": "1KB", "folder": "Large"},
+    ], default=None)
+
+    folders = {path.name: rules(path) for path in tmp_path.iterdir()}
+    assert folders == {"photo.JPG": "Photos", "notes.txt": None, "report-2024.pdf": "Reports/pdf",
+                       "data.bin": None, "big.bin": "Large"}
+    assert rules.hits == {"photos": 1, "reports": 1, "big": 1}
+    assert rules.unmatched == 2
+
+
+def test_rules_default_and_single_extension(tmp_path):
+    make_files(tmp_path, ["a.md", "b"])
+    rules = ac.RuleSet([{"extensions": "md", "max_age_days": 1, "folder": "Recent"}])
+    assert rules(tmp_path / "a.md") == "Recent"
+    assert rules(tmp_path / "b") == "no_extension"
+
+
+def test_rule_glob_and_regex_must_both_match(tmp_path):
+    make_files(tmp_path, ["report-2024.pdf", "report-draft.pdf", "summary-2024.pdf"])
+    rules = ac.RuleSet([{"glob": ["report-*", "annual-*"], "regex": r".*-\d{4}\.pdf", "folder": "Reports"}],
+                       default=None)
+    assert {path.name: rules(path) for path in tmp_path.iterdir()} == {
+        "report-2024.pdf": "Reports", "report-draft.pdf": None, "summary-2024.pdf": None}
+
+
+@pytest.mark.parametrize("spec, field", [
+    ({"folder": "x", "min_size": True}, "min_size"),
+    ({"folder": "x", "max_size": "lots"}, "max_size"),
+    ({"folder": "x", "min_age_days": "7"}, "min_age_days"),
+    ({"folder": "x", "extensions": ["jpg", 1]}, "extensions"),
+    ({"folder": 5}, "folder"),
+    ({"folder": "../outside"}, "outside"),
+])
+def test_invalid_rules_name_the_field(spec, field):
+    with pytest.raises(ValueError, match=field):
+        ac.RuleSet([{"name": "bad", **spec}])
+
+
+# --- Empty folders ---
+def test_prune_empty_folders(tmp_path):
+    root = tmp_path / "root"
+    (root / "a" / "b" / "c").mkdir(parents=True)
+    (root / "d" / "e").mkdir(parents=True)
+    make_files(root / "d", ["keep.txt"])
+
+    removed = ac.prune_empty_folders({root / "a" / "b" / "c", root / "d" / "e", root}, root)
+    assert removed == 4
+    assert sorted(p.relative_to(root).as_posix() for p in root.rglob("*")) == ["d", "d/keep.txt"]
+    assert root.exists()
+
+
+# --- Copies to another drive ---
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(ac, "COPY_CHUNK", 1024)
+    monkeypatch.setattr(ac, "PARALLEL_COPY_MIN", 4096)
+
+
+def partial_paths(source, target):
+    stat = source.stat()
+    stem = f".{target.name}.{stat.st_size:x}-{stat.st_mtime_ns:x}"
+    return target.with_name(stem + ac.PARTIAL_SUFFIX), target.with_name(stem + ".chunks" + ac.PARTIAL_SUFFIX)
+
+
+def test_copy_across_resumes_logged_chunks(tmp_path, small_chunks, monkeypatch):
+    data = os.urandom(10 * 1024 + 100)
+    source = tmp_path / "big.bin"
+    source.write_bytes(data)
+    target = tmp_path / "out" / "big.bin"
+    target.parent.mkdir()
+    partial, chunk_log = partial_paths(source, target)
+    # An earlier run copied chunks 0 and 3 before it was interrupted
+    partial.write_bytes(data[:1024] + bytes(2048) + data[3072:4096] + bytes(len(data) - 4096))
+    chunk_log.write_text("0\n3\n")
+
+    copied = []
+    copy_range = ac.copy_range
+
+    def record_copy(src, dst, offset, count, sync=False):
+        copied.append(offset)
+        copy_range(src, dst, offset, count, sync)
+
+    monkeypatch.setattr(ac, "copy_range", record_copy)
+    ac.copy_across(source, target)
+
+    assert sorted(copied) == [1024 * chunk for chunk in (1, 2, 4, 5, 6, 7, 8, 9, 10)]
+    assert target.read_bytes() == data
+    assert not source.exists()
+    assert not partial.exists() and not chunk_log.exists()
+
+
+def test_copy_across_keeps_changed_source(tmp_path, small_chunks, monkeypatch):
+    source = tmp_path / "big.bin"
+    source.write_bytes(os.urandom(8192))
+    target = tmp_path / "out" / "big.bin"
+    target.parent.mkdir()
+    copy_range = ac.copy_range
+
+    def copy_and_append(src, dst, offset, count, sync=False):
+        copy_range(src, dst, offset, count, sync)
+        if offset == 0:
+            with open(src, "ab") as f:
+                f.write(b"more")
+
+    monkeypatch.setattr(ac, "copy_range", copy_and_append)
+    with pytest.raises(OSError, match="changed"):
+        ac.copy_across(source, target)
+    assert source.stat().st_size == 8196
+    assert not target.exists()
+    assert [p.name for p in target.parent.iterdir()] == []
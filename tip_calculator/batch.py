@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Python Tip Calculator – Batch Version
+Splits many bills at once with NumPy: tip, total bill and per-person
+shares for whole arrays or CSV files of receipts.
+
+Amounts are settled in whole cents. The tip is rounded half up to the cent,
+and the total is split so the shares add back up to it exactly: everyone
+pays per_person, and `extra` of the people pay one cent more.
+
+Run from the repo root:
+    python3 -m tip_calculator.batch receipts.csv -o settled.csv
+"""
+
+import argparse
+import csv
+import itertools
+import sys
+
+import numpy as np
+
+from tip_calculator.calculator import SYSTEM_DECIMAL, SYSTEM_THOUSAND, parse_number
+
+# Rows read, split and written at once by split_csv()
+CHUNKSIZE = 100_000
+
+# Accepted CSV column names for each input
+COLUMNS = {
+    "bill": ("bill", "amount"),
+    "tip_percent": ("tip_percent", "tip"),
+    "people": ("people", "persons"),
+}
+OUTPUT_COLUMNS = ["bill", "tip_percent", "people", "tip", "total", "per_person", "extra_cents"]
+# One output row; amounts are written from whole cents as dollars and cents
+OUTPUT_ROW = "%d.%02d,%g,%d,%d.%02d,%d.%02d,%d.%02d,%d\n"
+# With a "." decimal point and no "." grouping, every value float() accepts
+# means the same to parse_number(), so whole columns can be converted at once
+PLAIN_FLOATS = SYSTEM_DECIMAL == "." and SYSTEM_THOUSAND in ("", ",")
+NAMES = {"bill": "bill", "tip_percent": "tip percentage", "people": "people"}
+# Largest total in cents: exact in float64 and safe to cast to int64
+MAX_CENTS = 2 ** 53
+
+# --- Core calculation logic ---
+
+
+def check_inputs(bills, tip_percents, people, first_row=0, lines=None):
+    """
+    Raise ValueError for the first bad row: negative, missing or infinite
+    amounts, a head count that is not a whole number of at least 1 (or is
+    absurdly large), or a total too large to count in cents (MAX_CENTS).
+    Rows are numbered from first_row, or by lines (one number per bill).
+    """
+    with np.errstate(invalid="ignore"):  # inf * 0 is caught by the first checks
+        checks = [
+            (~(np.isfinite(bills) & (bills >= 0)), "bill must be a finite number of at least 0"),
+            (~(np.isfinite(tip_percents) & (tip_percents >= 0)),
+             "tip percentage must be a finite number of at least 0"),
+            (~((people >= 1) & (people <= MAX_CENTS)) | (people != np.floor(people)),
+             f"people must be a whole number from 1 to {MAX_CENTS:,}"),
+            (~(np.rint(bills * 100) * (1 + tip_percents / 100) < MAX_CENTS),
+             f"total must be less than {MAX_CENTS / 100:,.2f}"),
+        ]
+    for bad, message in checks:
+        if bad.any():
+            row = int(np.argmax(bad))
+            raise ValueError(f"Row {first_row + row if lines is None else lines[row]}: {message}")
+
+
+def split_cents(bill_cents, tip_percents, people):
+    """
+    Split bills given in whole cents among people.
+    Returns a tuple of int64 arrays: (tip, total, per_person, extra), where
+    per_person * people + extra == total for every bill.
+    """
+    bill_cents = np.asarray(bill_cents, dtype=np.int64)
+    tip_cents = np.floor(bill_cents * np.asarray(tip_percents, dtype=float) / 100 + 0.5).astype(np.int64)
+    total_cents = bill_cents + tip_cents
+    per_person, extra = np.divmod(total_cents, np.asarray(people, dtype=np.int64))
+    return tip_cents, total_cents, per_person, extra
+
+
+def split_bills(bills, tip_percents, people) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized calculate_tip() for arrays of bills; tip_percents and people
+    may also be single numbers. Bills are rounded to the cent first.
+    Returns a tuple of arrays: (total_tip, total_bill, amount_per_person, extra_cents)
+    """
+    bills, tip_percents, people = np.broadcast_arrays(
+        np.asarray(bills, dtype=float), np.asarray(tip_percents, dtype=float), np.asarray(people, dtype=float))
+    check_inputs(bills, tip_percents, people)
+    tip, total, per_person, extra = split_cents(np.rint(bills * 100), tip_percents, people)
+    return tip / 100, total / 100, per_person / 100, extra
+
+
+# --- CSV streaming ---
+
+
+def parse_column(values, lines, column="bill") -> np.ndarray:
+    """
+    Parse a column of number strings with the rules of parse_number(), so
+    "1.234,56" and (in an EU locale) "1.234" read as they do in the calculator.
+    Raises ValueError with the line (from lines) of the first value that is
+    empty or not a number.
+    """
+    if PLAIN_FLOATS:
+        try:
+            return np.array(values, dtype=float)
+        except ValueError:
+            pass  # grouped, EU formatted or bad values: parse one by one
+    parsed = np.empty(len(values))
+    for i, value in enumerate(values):
+        try:
+            parsed[i] = parse_number(value)
+        except ValueError:
+            problem = "is empty" if not value.strip() else f"'{value}' is not a number"
+            raise ValueError(f"Row {lines[i]}: {NAMES[column]} {problem}") from None
+    return parsed
+
+
+def find_columns(header, tip_percent=None, people=None):
+    """Index of each input column in the header, or None for a column that is
+    missing but has a default."""
+    names = [name.strip().lower() for name in header]
+    defaults = {"bill": None, "tip_percent": tip_percent, "people": people}
+    found = {}
+    for column, aliases in COLUMNS.items():
+        index = next((names.index(alias) for alias in aliases if alias in names), None)
+        if index is None and defaults[column] is None:
+            raise ValueError(f"Missing '{column}' column (expected one of: {', '.join(aliases)})")
+        found[column] = index
+    return found
+
+
+def numbered_rows(reader):
+    """Yield (line, row) for every row of a csv.reader that is not blank;
+    line is the line of the file the row starts on."""
+    line = reader.line_num
+    for row in reader:
+        if row:
+            yield line + 1, row
+        line = reader.line_num
+
+
+def read_bills(reader, columns, tip_percent=None, people=None, chunksize=CHUNKSIZE):
+    """Yield (lines, bills, tip_percents, people) for chunks of the rows of a
+    csv.reader; lines holds the line number of each bill."""
+    rows = numbered_rows(reader)
+    while True:
+        chunk = list(itertools.islice(rows, chunksize))
+        if not chunk:
+            return
+        lines = [line for line, _ in chunk]
+        parsed = []
+        for column, default in (("bill", None), ("tip_percent", tip_percent), ("people", people)):
+            index = columns[column]
+            if index is None:
+                parsed.append(np.full(len(chunk), default, dtype=float))
+            else:
+                # A row too short for the column counts as an empty cell
+                values = [row[index] if index < len(row) else "" for _, row in chunk]
+                parsed.append(parse_column(values, lines, column))
+        yield (lines, *parsed)
+
+
+def format_rows(bill_cents, tip_percents, people, tip, total, per_person, extra) -> str:
+    """CSV text for a chunk of settled bills (amounts in whole cents)."""
+    dollars, cents = np.divmod(np.column_stack([bill_cents, tip, total, per_person]).astype(np.int64), 100)
+    columns = [dollars[:, 0], cents[:, 0], tip_percents, people.astype(np.int64), dollars[:, 1], cents[:, 1],
+               dollars[:, 2], cents[:, 2], dollars[:, 3], cents[:, 3], extra]
+    # A single % over the whole chunk is much faster than formatting row by row
+    values = tuple(itertools.chain.from_iterable(zip(*[column.tolist() for column in columns])))
+    return (OUTPUT_ROW * len(extra)) % values
+
+
+def split_csv(input_file, output_file, tip_percent=None, people=None, chunksize=CHUNKSIZE) -> int:
+    """
+    Settle every bill in a CSV file (open text files) and write one result row
+    per bill, chunk by chunk, so files of any size run in bounded memory.
+    tip_percent and people are used when the input has no such column.
+    Returns the number of bills written.
+    """
+    reader = csv.reader(input_file)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("Input is empty")
+    columns = find_columns(header, tip_percent, people)
+
+    output_file.write(",".join(OUTPUT_COLUMNS) + "\n")
+    written = 0
+    for lines, bills, tips, heads in read_bills(reader, columns, tip_percent, people, chunksize):
+        check_inputs(bills, tips, heads, lines=lines)
+        bill_cents = np.rint(bills * 100)
+        tip, total, per_person, extra = split_cents(bill_cents, tips, heads)
+        output_file.write(format_rows(bill_cents, tips, heads, tip, total, per_person, extra))
+        written += len(bills)
+    return written
+
+
+# --- CLI Interface ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a CSV file of bills (columns: bill, tip_percent, people)")
+    parser.add_argument("input", help="CSV file with the bills, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="CSV file for the results (default: stdout)")
+    parser.add_argument("--tip", type=float, help="Tip percentage for bills without a tip_percent column")
+    parser.add_argument("--people", type=int, help="Head count for bills without a people column")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="Bills processed at once")
+    args = parser.parse_args()
+
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+
+    input_file = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        count = split_csv(input_file, output_file, args.tip, args.people, args.chunksize)
+    except ValueError as error:
+        sys.exit(f"Error: {error}")
+    finally:
+        for f in (input_file, output_file):
+            if f not in (sys.stdin, sys.stdout):
+                f.close()
+
+    if args.output != "-":
+        print(f"Settled {count} bills into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the batch bill splitter.
+
+Settles the same synthetic bills with the scalar calculate_tip() in a
+Python loop, with the vectorized split_bills(), and with split_csv()
+streaming a CSV file (parsing and writing included), and reports bills
+per second for each.
+
+Examples:
+  python3 tip_calculator/benchmarks/bench_batch.py --bills 1e6
+  python3 tip_calculator/benchmarks/bench_batch.py --bills 1e5 --out tip_calculator/benchmarks/results/current.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+# Add repo root to Python path so the package imports work
+current_dir = os.path.dirname(os.path.abspath(__file__))
+repo_dir = os.path.join(current_dir, "../..")
+sys.path.insert(0, repo_dir)
+
+from tip_calculator.batch import split_bills, split_csv  # noqa: E402
+from tip_calculator.calculator import calculate_tip  # noqa: E402
+
+
+# -----------------------
+# Synthetic bills
+# -----------------------
+def generate_bills(count, seed=0):
+    """Bills of 1 - 500 (in cents), tips of 0 - 25% and 1 - 12 people."""
+    rng = np.random.default_rng(seed)
+    bills = rng.integers(100, 50_000, count) / 100
+    tips = rng.choice([0, 10, 12, 15, 18, 20, 25], count).astype(float)
+    people = rng.integers(1, 13, count)
+    return bills, tips, people
+
+
+def bills_csv(bills, tips, people):
+    text = io.StringIO()
+    text.write("bill,tip_percent,people\n")
+    np.savetxt(text, np.column_stack([bills, tips, people]), fmt=["%.2f", "%g", "%d"], delimiter=",")
+    return text.getvalue()
+
+
+# -----------------------
+# Measurements
+# -----------------------
+def measure(func, repeat=3):
+    """Best wall time of func() over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(count, repeat=3, seed=0):
+    bills, tips, people = generate_bills(count, seed)
+    scalar_args = list(zip(bills.tolist(), tips.tolist(), people.tolist()))
+    text = bills_csv(bills, tips, people)
+
+    cases = {
+        "calculate_tip": lambda: [calculate_tip(*args) for args in scalar_args],
+        "split_bills": lambda: split_bills(bills, tips, people),
+        "split_csv": lambda: split_csv(io.StringIO(text), io.StringIO()),
+    }
+    results = {}
+    for name, func in cases.items():
+        seconds = measure(func, repeat)
+        results[name] = {"seconds": seconds, "bills_per_second": count / seconds if seconds > 0 else None}
+    scalar_seconds = results["calculate_tip"]["seconds"]
+    for result in results.values():
+        result["speedup"] = scalar_seconds / result["seconds"] if result["seconds"] > 0 else None
+    return results
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+# -----------------------
+# CLI Wrapper
+# -----------------------
+def main():
+    parser = argparse.ArgumentParser(description="Throughput benchmark for the batch bill splitter")
+    parser.add_argument("--bills", type=float, default=1e5, help="Number of bills")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (best is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--out", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.bills < 1 or args.repeat < 1:
+        parser.error("--bills and --repeat must be at least 1")
+
+    results = run_benchmarks(int(args.bills), args.repeat, args.seed)
+    for name, result in results.items():
+        print(f"{name:<16}{result['seconds']:>10.4f}s{result['bills_per_second']:>14.0f} bills/s"
+              f"{result['speedup']:>8.1f}x")
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"config": {"bills": int(args.bills), "seed": args.seed},
+                       "environment": environment(), "results": results}, f, indent=2)
+        print(f"\nResults saved to: {args.out}")
+
+
+# -----------------------
+# Entry point
+# -----------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import io
+import locale
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tip_calculator import batch
+from tip_calculator.batch import split_bills, split_csv
+from tip_calculator.calculator import calculate_tip
+
+
+class TestSplitBills(unittest.TestCase):
+
+    def test_matches_scalar_calculation(self):
+        bills = [100, 200, 80, 59.99]
+        tips = [15, 0, 10, 12]
+        people = [2, 4, 1, 3]
+        total_tip, total_bill, per_person, extra = split_bills(bills, tips, people)
+        for i in range(len(bills)):
+            tip, total, share = calculate_tip(bills[i], tips[i], people[i])
+            self.assertAlmostEqual(total_tip[i], tip, delta=0.005)
+            self.assertAlmostEqual(total_bill[i], total, delta=0.005)
+            self.assertAlmostEqual(per_person[i], share, delta=0.01)
+
+    def test_shares_add_up_to_total(self):
+        rng = np.random.default_rng(0)
+        bills = rng.uniform(0, 500, 10_000).round(2)
+        people = rng.integers(1, 13, 10_000)
+        _, total_bill, per_person, extra = split_bills(bills, 15, people)
+        total_cents = np.rint(total_bill * 100)
+        self.assertTrue(np.array_equal(np.rint(per_person * 100) * people + extra, total_cents))
+        self.assertTrue(((extra >= 0) & (extra < people)).all())
+
+    def test_uneven_split(self):
+        total_tip, total_bill, per_person, extra = split_bills([100], [0], [3])
+        self.assertAlmostEqual(total_bill[0], 100)
+        self.assertAlmostEqual(per_person[0], 33.33)
+        self.assertEqual(extra[0], 1)  # one person pays 33.34
+
+    def test_tip_rounds_half_up(self):
+        total_tip, total_bill, _, _ = split_bills([28.50], [15], [1])
+        self.assertAlmostEqual(total_tip[0], 4.28)
+        self.assertAlmostEqual(total_bill[0], 32.78)
+
+    def test_rejects_infinite_and_huge_values(self):
+        cases = [([np.inf], 10, 2, "bill"), ([np.nan], 10, 2, "bill"), ([10], np.inf, 2, "tip"),
+                 ([0], np.inf, 2, "tip"), ([10], 10, [np.inf], "people"), ([10], 10, [1e300], "people"),
+                 ([1e14], 10, 2, "total")]
+        for bills, tips, people, message in cases:
+            with self.subTest(bills=bills, tips=tips, people=people):
+                with self.assertRaisesRegex(ValueError, f"Row 0: {message}"):
+                    split_bills(bills, tips, people)
+
+    def test_invalid_people(self):
+        with self.assertRaises(ValueError):
+            split_bills([100, 50], 10, [2, 0])
+        with self.assertRaises(ValueError):
+            split_bills([100], 10, [2.5])
+
+
+class TestSplitCsv(unittest.TestCase):
+
+    def test_streams_in_chunks(self):
+        source = io.StringIO("bill,tip_percent,people\n100,15,2\n\n100,0,3\n59.99,12,3\n")
+        output = io.StringIO()
+        self.assertEqual(split_csv(source, output, chunksize=2), 3)
+        self.assertEqual(output.getvalue().splitlines(), [
+            "bill,tip_percent,people,tip,total,per_person,extra_cents",
+            "100.00,15,2,15.00,115.00,57.50,0",
+            "100.00,0,3,0.00,100.00,33.33,1",
+            "59.99,12,3,7.20,67.19,22.39,2",
+        ])
+
+    def test_default_columns_and_eu_numbers(self):
+        source = io.StringIO('bill\n"1.234,56"\n')
+        output = io.StringIO()
+        split_csv(source, output, tip_percent=10, people=2)
+        self.assertEqual(output.getvalue().splitlines()[1], "1234.56,10,2,123.46,1358.02,679.01,0")
+
+    def test_missing_column(self):
+        with self.assertRaises(ValueError):
+            split_csv(io.StringIO("bill\n10\n"), io.StringIO())
+
+    def test_bad_row_is_reported(self):
+        with self.assertRaisesRegex(ValueError, "Row 3"):
+            split_csv(io.StringIO("bill,tip,people\n10,10,1\n10,10,0\n"), io.StringIO())
+
+    def test_row_numbers_count_blank_lines(self):
+        with self.assertRaisesRegex(ValueError, "Row 5: people"):
+            split_csv(io.StringIO("bill,tip,people\n10,10,1\n\n\n10,10,0\n"), io.StringIO(), chunksize=1)
+
+    def test_empty_and_bad_cells_are_reported(self):
+        with self.assertRaisesRegex(ValueError, "Row 3: bill is empty"):
+            split_csv(io.StringIO("bill,tip,people\n10,10,1\n,10,1\n"), io.StringIO())
+        with self.assertRaisesRegex(ValueError, "Row 4: people is empty"):
+            split_csv(io.StringIO("bill,tip,people\n10,10,1\n\n10,10\n"), io.StringIO())
+        with self.assertRaisesRegex(ValueError, "Row 2: tip percentage 'ten' is not a number"):
+            split_csv(io.StringIO("bill,tip,people\n10,ten,1\n"), io.StringIO())
+
+    def test_infinite_and_huge_rows_are_reported(self):
+        for row, message in [("inf,10,1", "bill"), ("10,10,nan", "people"), ("1e14,10,1", "total"),
+                             ("10,1e300,1", "total")]:
+            with self.subTest(row=row):
+                with self.assertRaisesRegex(ValueError, f"Row 4: {message}"):
+                    split_csv(io.StringIO(f"bill,tip,people\n10,10,1\n\n{row}\n"), io.StringIO())
+
+    def test_numbers_follow_the_locale(self):
+        def eu_atof(value):  # locale.atof() with a "," decimal point and "." grouping
+            return float(value.replace(".", "").replace(",", "."))
+
+        with mock.patch.object(batch, "PLAIN_FLOATS", False), mock.patch.object(locale, "atof", eu_atof):
+            output = io.StringIO()
+            split_csv(io.StringIO('bill,tip,people\n1.234,10,2\n"12,5",0,1\n'), output)
+        self.assertEqual(output.getvalue().splitlines()[1:], [
+            "1234.00,10,2,123.40,1357.40,678.70,0",
+            "12.50,0,1,0.00,12.50,12.50,0",
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()